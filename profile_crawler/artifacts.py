@@ -0,0 +1,270 @@
+"""
+调试产物写入：截图和HTML交给后台线程写盘，HTML压缩存储并按内容去重，生产环境可设为仅失败时保存
+"""
+
+import base64
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# 保存策略: always 每次都保存; on_failure 只在流程失败时保存最近的快照; never 不保存
+POLICIES = ('always', 'on_failure', 'never')
+
+HTML_EXTENSIONS = {'gzip': '.html.gz', 'zstd': '.html.zst', 'none': '.html'}
+
+# 进程池中多个会话的写入器共用同一个产物索引文件，读取-合并-替换期间互斥
+_INDEX_LOCK = threading.Lock()
+
+
+class Base64Image(str):
+    """CDP截图返回的base64数据，在写盘线程中解码"""
+
+
+def open_artifact_stream(path):
+    """以文本流方式打开HTML产物，用于分块读取大文件"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("读取.zst文件需要安装zstandard（pip install zstandard）")
+        raw = open(path, 'rb')
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True),
+                                encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+class ArtifactWriter:
+    def __init__(self, config, tracer=None):
+        """初始化产物写入器，配置取config.json中的artifacts；tracer用于统计写盘耗时"""
+        settings = config.get('artifacts', {})
+        self.output_dir = config.get('output_directory', './output')
+        self.policy = settings.get('policy', 'always')
+        if self.policy not in POLICIES:
+            logger.warning(f"⚠️  未知的artifacts.policy: {self.policy}，使用always")
+            self.policy = 'always'
+        self.compression = settings.get('compression', 'gzip')
+        if self.compression not in HTML_EXTENSIONS:
+            logger.warning(f"⚠️  未知的artifacts.compression: {self.compression}，使用gzip")
+            self.compression = 'gzip'
+        if self.compression == 'zstd' and zstandard is None:
+            logger.warning("⚠️  未安装zstandard，HTML改用gzip压缩（pip install zstandard）")
+            self.compression = 'gzip'
+        self.level = settings.get('compression_level', 6 if self.compression == 'gzip' else 3)
+        self.dedupe = settings.get('dedupe', True)
+        self.tracer = tracer
+
+        self._queue = queue.Queue(maxsize=settings.get('queue_size', 32))
+        self._thread = None
+        # 最近写出的HTML摘要 -> 文件路径，按最近使用淘汰，长时间运行时不无限增长
+        self._written = OrderedDict()
+        self._written_lock = threading.Lock()
+        self.dedupe_cache = settings.get('dedupe_cache', 256)
+        # 各类产物最新文件的索引，查找时无需列出输出目录
+        self.latest_index_path = os.path.join(self.output_dir, 'artifacts_latest.json')
+        self._latest = None
+        # 本写入器更新过、尚未写入索引文件的条目
+        self._latest_pending = {}
+        self._latest_lock = threading.Lock()
+        # on_failure策略下暂存最近的快照，失败时再写盘
+        self._buffer = deque(maxlen=settings.get('failure_buffer', 8))
+
+    def _path(self, prefix, ext):
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        return os.path.join(self.output_dir, f'{prefix}_{timestamp}{ext}')
+
+    def _encode_html(self, html_text):
+        data = html_text.encode('utf-8')
+        if self.compression == 'gzip':
+            return gzip.compress(data, compresslevel=self.level)
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        return data
+
+    def _read_latest(self):
+        """读取磁盘上的产物索引，不存在或损坏时返回空索引"""
+        if not os.path.exists(self.latest_index_path):
+            return {}
+        try:
+            with open(self.latest_index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  读取产物索引失败: {e}")
+            return {}
+
+    def _load_latest(self):
+        if self._latest is None:
+            self._latest = self._read_latest()
+        return self._latest
+
+    def _set_latest(self, key, path):
+        with self._latest_lock:
+            self._load_latest()[key] = path
+            self._latest_pending[key] = path
+
+    def _persist_latest(self):
+        """把本写入器更新的条目合并进磁盘上的索引；先读取最新内容，不覆盖其他会话写入的条目"""
+        with self._latest_lock:
+            pending, self._latest_pending = self._latest_pending, {}
+        if not pending:
+            return
+        try:
+            with _INDEX_LOCK:
+                latest = self._read_latest()
+                latest.update(pending)
+                self._write_latest(latest)
+        except OSError:
+            # 写盘失败时保留待写条目，下次写入产物时重试
+            with self._latest_lock:
+                self._latest_pending = dict(pending, **self._latest_pending)
+            raise
+        with self._latest_lock:
+            self._latest.update({key: path for key, path in latest.items() if key not in self._latest_pending})
+
+    def _write_latest(self, latest):
+        # 临时文件名唯一，多个写入器（包括其他进程）同时写盘时互不覆盖
+        fd, tmp_path = tempfile.mkstemp(prefix='artifacts_latest_', suffix='.tmp', dir=self.output_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(latest, f, ensure_ascii=False)
+            os.replace(tmp_path, self.latest_index_path)
+        except OSError:
+            os.remove(tmp_path)
+            raise
+
+    def latest(self, prefix, kind='html'):
+        """返回某类产物（如before_click的html）最近一次保存的文件路径，不存在时返回None"""
+        with self._latest_lock:
+            path = self._load_latest().get(f'{prefix}.{kind}')
+        return path if path and os.path.exists(path) else None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='artifact-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, payload, digest = item
+                if self.tracer:
+                    with self.tracer.span('artifact.write', path=os.path.basename(path)):
+                        self._write(path, payload)
+                else:
+                    self._write(path, payload)
+                # 写盘成功后才登记摘要，写入失败时相同内容下次仍会保存
+                if digest:
+                    self._remember(digest, path)
+            except Exception as e:
+                logger.error(f"写入产物失败 {item[0] if item else ''}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, path, payload):
+        if isinstance(payload, Base64Image):
+            payload = base64.b64decode(payload)
+        elif isinstance(payload, str):
+            payload = self._encode_html(payload)
+        with open(path, 'wb') as f:
+            f.write(payload)
+        self._persist_latest()
+
+    def _submit(self, path, payload, digest=None):
+        self._ensure_thread()
+        # 队列满时阻塞，限制内存中待写入的快照数量
+        self._queue.put((path, payload, digest))
+
+    def _remember(self, digest, path):
+        with self._written_lock:
+            self._written[digest] = path
+            self._written.move_to_end(digest)
+            while len(self._written) > self.dedupe_cache:
+                self._written.popitem(last=False)
+
+    def _written_path(self, digest):
+        """返回相同内容已写出的文件路径（文件已被删除时视为未写出）"""
+        with self._written_lock:
+            path = self._written.get(digest)
+            if path is None:
+                return None
+            if not os.path.exists(path):
+                del self._written[digest]
+                return None
+            self._written.move_to_end(digest)
+            return path
+
+    def save_html(self, prefix, html_text, force=False):
+        """保存HTML（后台压缩写盘），返回文件路径；未保存（策略跳过或内容重复）时返回已有路径或None"""
+        if self.policy == 'never' and not force:
+            return None
+        path = self._path(prefix, HTML_EXTENSIONS[self.compression])
+        if self.policy == 'on_failure' and not force:
+            self._buffer.append((prefix, path, html_text))
+            return None
+        digest = None
+        if self.dedupe:
+            digest = hashlib.sha1(html_text.encode('utf-8')).hexdigest()
+            existing = self._written_path(digest)
+            if existing:
+                logger.info(f"HTML内容与 {existing} 相同，跳过保存")
+                self._set_latest(f'{prefix}.html', existing)
+                return existing
+        self._set_latest(f'{prefix}.html', path)
+        self._submit(path, html_text, digest)
+        logger.info(f"HTML已保存: {path}")
+        return path
+
+    def save_screenshot(self, prefix, image, force=False, ext='.png'):
+        """保存截图（后台解码写盘），image为图片字节或Base64Image，返回文件路径"""
+        if self.policy != 'always' and not force:
+            return None
+        path = self._path(prefix, ext)
+        self._set_latest(f'{prefix}.{ext.lstrip(".")}', path)
+        self._submit(path, image)
+        logger.info(f"截图已保存: {path}")
+        return path
+
+    def flush_failure(self):
+        """流程失败时写出on_failure策略下暂存的快照，返回写出的路径列表"""
+        paths = []
+        while self._buffer:
+            prefix, path, html_text = self._buffer.popleft()
+            self._set_latest(f'{prefix}.html', path)
+            self._submit(path, html_text)
+            paths.append(path)
+        if paths:
+            logger.info(f"已保存失败前的 {len(paths)} 个页面快照")
+        return paths
+
+    def discard(self):
+        """流程成功时丢弃暂存的快照"""
+        self._buffer.clear()
+
+    def wait(self):
+        """等待队列中的产物全部写完"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """等待所有产物写完并停止后台线程"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
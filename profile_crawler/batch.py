@@ -0,0 +1,249 @@
+"""
+无人值守批处理：从任务文件或命令行读取任务（页面URL或命名流程），按异常类型重试和退避，
+逐个任务记录断点，结束时输出汇总并以退出码表示成败，全程不等待终端输入
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from crawler import Crawler
+
+logger = logging.getLogger(__name__)
+
+# 按异常类型的重试策略，按异常类的继承顺序匹配（TimeoutException优先于其父类WebDriverException），
+# 未匹配的异常使用default；可在config.json的batch.retry中覆盖
+DEFAULT_RETRY = {
+    'TimeoutException': {'max_retries': 3, 'backoff': 5, 'factor': 2, 'restart_browser': False},
+    'WebDriverException': {'max_retries': 2, 'backoff': 10, 'factor': 2, 'restart_browser': True},
+    'default': {'max_retries': 1, 'backoff': 5, 'factor': 2, 'restart_browser': False},
+}
+
+
+class FlowFailed(Exception):
+    """命名流程执行完但未达到预期结果（如未能进入文献列表）"""
+
+
+class BatchAborted(Exception):
+    """无法继续执行任何任务（如Profile不存在）"""
+
+
+class InvalidJob(Exception):
+    """任务格式错误或任务类型未知，不重试"""
+
+
+def _flow_latest(crawler):
+    if not crawler.access_page():
+        raise FlowFailed("未能进入文献列表页面")
+    return {'url': crawler.driver.current_url, 'title': crawler.driver.title}
+
+
+# 命名流程：任务名 -> 执行函数，返回结果字典
+FLOWS = {
+    'latest': _flow_latest,
+}
+
+
+def parse_job(line):
+    """解析一行任务：JSON对象、页面URL或命名流程名称，空行和#注释返回None"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if line.startswith('{'):
+        job = json.loads(line)
+    elif line.startswith(('http://', 'https://')):
+        job = {'action': 'fetch', 'url': line}
+    else:
+        job = {'action': line}
+    job.setdefault('action', 'fetch' if 'url' in job else None)
+    job.setdefault('id', job.get('url') or job['action'])
+    return job
+
+
+def load_jobs(path):
+    """读取任务文件，每行一个任务"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [job for job in (parse_job(line) for line in f) if job]
+
+
+class BatchRunner:
+    def __init__(self, config_path='config.json', need_login=True, headless=None):
+        """初始化批处理，配置取config.json中的batch；批处理始终以非交互模式运行"""
+        self.crawler = Crawler(config_path)
+        self.crawler.config['interactive'] = False
+        if headless is not None:
+            self.crawler.config['headless'] = headless
+        self.need_login = need_login
+
+        settings = self.crawler.config.get('batch', {})
+        self.retry = dict(DEFAULT_RETRY)
+        for name, policy in settings.get('retry', {}).items():
+            self.retry[name] = dict(DEFAULT_RETRY.get(name, DEFAULT_RETRY['default']), **policy)
+        output_dir = self.crawler.config.get('output_directory', './output')
+        self.checkpoint_file = settings.get('checkpoint_file', os.path.join(output_dir, 'batch_checkpoint.json'))
+        self.checkpoint = {'done': {}, 'failed': {}}
+
+    def policy_for(self, error):
+        """按异常类的继承链查找重试策略"""
+        for cls in type(error).__mro__:
+            if cls.__name__ in self.retry:
+                return self.retry[cls.__name__]
+        return self.retry['default']
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_file):
+            return
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                self.checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  读取批处理断点失败: {e}")
+
+    def _save_checkpoint(self):
+        tmp_path = self.checkpoint_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.checkpoint, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_file)
+
+    def _remove_checkpoint(self):
+        try:
+            os.remove(self.checkpoint_file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"⚠️  删除批处理断点失败: {e}")
+
+    def _ensure_browser(self):
+        """浏览器未启动时启动并登录"""
+        if self.crawler.driver:
+            return
+        if self.crawler.setup_driver() is None:
+            raise BatchAborted("Profile不存在，请先完成登录")
+        if self.need_login and not self.crawler.auto_login():
+            self.restart_browser()
+            raise RuntimeError("登录失败")
+
+    def restart_browser(self):
+        """关闭当前浏览器，下一个任务前重新启动"""
+        if self.crawler.driver:
+            try:
+                self.crawler.driver.quit()
+            except Exception as e:
+                logger.warning(f"⚠️  关闭浏览器失败: {e}")
+            self.crawler.driver = None
+
+    def _execute(self, job):
+        self._ensure_browser()
+        action = job['action']
+        if action == 'fetch':
+            return self.crawler.fetch_page(job['url'])
+        if action in FLOWS:
+            return FLOWS[action](self.crawler)
+        raise InvalidJob(f"未知的任务类型: {action}")
+
+    def run_job(self, job):
+        """执行一个任务，失败时按异常类型的策略退避重试，返回 (是否成功, 结果或错误信息)"""
+        attempt = 0
+        while True:
+            try:
+                with self.crawler.tracer.span('batch.job', job=job['id'], attempt=attempt):
+                    result = self._execute(job)
+                # 标签页或浏览器内存超限时在两个任务之间回收
+                self.crawler.watchdog.maybe_recycle()
+                return True, result
+            except (BatchAborted, InvalidJob):
+                raise
+            except Exception as e:
+                policy = self.policy_for(e)
+                error = f"{type(e).__name__}: {e}"
+                if policy.get('restart_browser') or (isinstance(e, WebDriverException) and not self._browser_alive()):
+                    self.restart_browser()
+                if attempt >= policy['max_retries']:
+                    logger.error(f"❌ 任务失败 {job['id']}（已重试 {attempt} 次）: {error}")
+                    return False, error
+                delay = policy['backoff'] * policy.get('factor', 1) ** attempt
+                attempt += 1
+                logger.warning(f"⚠️  任务出错 {job['id']}: {error}，{delay:.0f}s 后第 {attempt} 次重试")
+                time.sleep(delay)
+
+    def _browser_alive(self):
+        if not self.crawler.driver:
+            return False
+        try:
+            self.crawler.driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def run(self, jobs, resume=True):
+        """依次执行任务，已在断点中完成的任务跳过，返回汇总字典"""
+        if resume:
+            self._load_checkpoint()
+        os.makedirs(os.path.dirname(os.path.abspath(self.checkpoint_file)), exist_ok=True)
+        summary = {'total': len(jobs), 'succeeded': 0, 'failed': 0, 'skipped': 0, 'aborted': False}
+        start = time.time()
+        try:
+            for i, job in enumerate(jobs):
+                if job['id'] in self.checkpoint['done']:
+                    summary['skipped'] += 1
+                    continue
+                logger.info(f"[{i + 1}/{len(jobs)}] {job['action']}: {job['id']}")
+                try:
+                    ok, result = self.run_job(job)
+                except BatchAborted as e:
+                    logger.error(f"❌ 批处理中止: {e}")
+                    summary['aborted'] = True
+                    break
+                except InvalidJob as e:
+                    ok, result = False, str(e)
+                    logger.error(f"❌ 任务无效 {job['id']}: {e}")
+                if ok:
+                    summary['succeeded'] += 1
+                    self.checkpoint['done'][job['id']] = result
+                    self.checkpoint['failed'].pop(job['id'], None)
+                else:
+                    summary['failed'] += 1
+                    self.checkpoint['failed'][job['id']] = result
+                self._save_checkpoint()
+        finally:
+            self.close()
+        # 全部任务都已完成时删除断点，下次（如定时任务）运行重新执行全部任务；有失败或中止时保留，重新运行只补做剩余任务
+        if not summary['aborted'] and all(job['id'] in self.checkpoint['done'] for job in jobs):
+            self._remove_checkpoint()
+        summary['seconds'] = round(time.time() - start, 3)
+        summary['failures'] = {job['id']: self.checkpoint['failed'][job['id']]
+                               for job in jobs if job['id'] in self.checkpoint['failed']}
+        return summary
+
+    def close(self):
+        self.crawler.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='无人值守批处理')
+    parser.add_argument('jobs', nargs='*', help='任务：页面URL或流程名称（如latest）')
+    parser.add_argument('--file', help='任务文件，每行一个URL、流程名称或JSON任务')
+    parser.add_argument('--config', default='config.json', help='配置文件路径')
+    parser.add_argument('--no-login', action='store_true', help='跳过登录流程')
+    parser.add_argument('--headless', action='store_true', help='以无头模式运行浏览器')
+    parser.add_argument('--fresh', action='store_true', help='忽略断点，重新执行全部任务')
+    args = parser.parse_args()
+
+    job_list = load_jobs(args.file) if args.file else []
+    job_list += [job for job in (parse_job(arg) for arg in args.jobs) if job]
+    if not job_list:
+        parser.error('请提供任务或任务文件')
+
+    result = BatchRunner(args.config, need_login=not args.no_login,
+                         headless=True if args.headless else None).run(job_list, resume=not args.fresh)
+    logger.info("=" * 60)
+    logger.info(f"批处理完成: 共 {result['total']} 个任务，成功 {result['succeeded']} 个，"
+                f"失败 {result['failed']} 个，跳过 {result['skipped']} 个，耗时 {result['seconds']:.1f}s")
+    for job_id, error in result['failures'].items():
+        logger.info(f"  失败: {job_id} - {error}")
+    sys.exit(2 if result['aborted'] else (1 if result['failed'] else 0))
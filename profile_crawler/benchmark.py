@@ -0,0 +1,363 @@
+"""
+性能基准测试：用本地HTTP服务器模拟目标站点（首页"最新上线"区域的查看更多按钮和文献列表分页），
+在无网络、可重复的条件下测量各运行模式的端到端耗时、WebDriver往返次数和每秒页面数
+"""
+
+import argparse
+import glob
+import http.server
+import json
+import logging
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from string import Template
+from urllib.parse import parse_qs, urlsplit
+
+from crawler import Crawler, PROFILE_NAME
+from http_fetch import BrowserSessionFetcher
+from pool import CrawlerPool
+from tabs import TabScheduler
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_fixtures')
+MODES = ('headless', 'pool', 'tabs', 'http')
+
+DEFAULT_SETTINGS = {
+    'latency_ms': 50,
+    'list_pages': 5,
+    'items_per_page': 20,
+    'pool_size': 2,
+    'repeat': 3,
+}
+
+
+class FixtureSite:
+    def __init__(self, list_pages, items_per_page):
+        """按页数和每页条目数从bench_fixtures中的模板生成站点页面"""
+        self.list_pages = list_pages
+        self.items_per_page = items_per_page
+        self.templates = {}
+        for name in ('index', 'list', 'list_item', 'article'):
+            with open(os.path.join(FIXTURE_DIR, f'{name}.html'), 'r', encoding='utf-8') as f:
+                self.templates[name] = Template(f.read())
+
+    def list_url(self, page):
+        return f'/latest_online?page={page}'
+
+    def _items(self, page, count):
+        start = (page - 1) * self.items_per_page
+        return '\n'.join(self.templates['list_item'].substitute(number=start + i + 1, day=f'{i % 28 + 1:02d}')
+                         for i in range(count))
+
+    def index(self):
+        preview = ''.join(f'<li>基准测试文献 {i + 1}</li>' for i in range(5))
+        return self.templates['index'].substitute(list_url=self.list_url(1), hot_items=preview,
+                                                  latest_items=preview)
+
+    def list_page(self, page):
+        last = page >= self.list_pages
+        return self.templates['list'].substitute(
+            page=page, pages=self.list_pages, total=self.list_pages * self.items_per_page,
+            items=self._items(page, self.items_per_page),
+            next_class='btn-next disabled' if last else 'btn-next',
+            next_disabled='disabled' if last else '',
+            next_url=self.list_url(page + 1),
+        )
+
+    def render(self, path, query):
+        """返回 (状态码, HTML)；页面不存在时返回404"""
+        if path in ('/', '/index'):
+            return 200, self.index()
+        if path == '/latest_online':
+            page = int(query.get('page', ['1'])[0])
+            if 1 <= page <= self.list_pages:
+                return 200, self.list_page(page)
+        if path.startswith('/article/'):
+            number = path.rsplit('/', 1)[-1]
+            if number.isdigit() and 1 <= int(number) <= self.list_pages * self.items_per_page:
+                return 200, self.templates['article'].substitute(number=number)
+        if path == '/api/notice':
+            return 200, '基准测试站点公告'
+        return 404, '<html><body>404</body></html>'
+
+
+class _FixtureHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        parts = urlsplit(self.path)
+        status, body = server.site.render(parts.path, parse_qs(parts.query))
+        data = body.encode('utf-8')
+        with server.lock:
+            server.requests += 1
+            if status == 200 and parts.path != '/api/notice':
+                server.pages += 1
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, site, latency_ms=0, host='127.0.0.1', port=0):
+        """本地站点服务器，每个请求先等待latency_ms毫秒以模拟网络延迟；port为0时自动分配"""
+        super().__init__((host, port), _FixtureHandler)
+        self.site = site
+        self.latency = latency_ms / 1000
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.pages = 0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = 0
+            self.pages = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+@contextmanager
+def _workspace(base_config, overrides):
+    """在临时目录中准备配置和空白Profile并切换工作目录，保证每次运行都不受之前索引、断点和缓存的影响"""
+    workdir = tempfile.mkdtemp(prefix='crawler_bench_')
+    previous = os.getcwd()
+    config = dict(base_config, **overrides)
+    # 输出、索引、断点、会话缓存和追踪文件都使用相对路径，落在临时目录内
+    config['output_directory'] = './output'
+    config['index'] = dict(config.get('index', {}), path='./output/crawl_index.sqlite3')
+    config['pagination'] = dict(config.get('pagination', {}), cursor_file='./output/pagination_cursor.json')
+    config['session_cache'] = dict(config.get('session_cache', {}), path='chrome_profile/session_cache.json')
+    config['metrics'] = dict(config.get('metrics', {}), enabled=True, trace_directory='./output/traces')
+    # 浏览器路径缓存沿用项目目录下的，避免每次运行都重新查找chromedriver
+    launcher = config.get('launcher', {})
+    config['launcher'] = dict(launcher, path_cache=os.path.abspath(
+        launcher.get('path_cache', os.path.join('chrome_profile', 'launcher_paths.json'))))
+    try:
+        os.makedirs(os.path.join(workdir, 'chrome_profile', PROFILE_NAME))
+        config_path = os.path.join(workdir, 'config.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False, indent=2)
+        os.chdir(workdir)
+        yield config_path
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _trace_totals(trace_dir):
+    """汇总追踪文件中的WebDriver命令次数和耗时（会话池中每个会话各有一个追踪文件）"""
+    round_trips, seconds = 0, 0.0
+    for path in glob.glob(os.path.join(trace_dir, 'trace_*.jsonl')):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                event = json.loads(line)
+                if event.get('type') == 'summary':
+                    for stat in event.get('commands', {}).values():
+                        round_trips += stat['count']
+                        seconds += stat['seconds']
+    return round_trips, seconds
+
+
+def _count_records(output_dir):
+    count = 0
+    for path in glob.glob(os.path.join(output_dir, 'literature_*.jsonl')):
+        with open(path, 'r', encoding='utf-8') as f:
+            count += sum(1 for line in f if line.strip())
+    return count
+
+
+def _run_headless(config_path, site, base_url, pool_size):
+    """端到端运行Crawler.run：首页 -> 点击查看更多 -> 翻页并提取全部列表页"""
+    crawler = Crawler(config_path)
+    crawler.run(need_login=False)
+    # run()内部会捕获异常，通过提取到的记录数确认流程完整跑完
+    expected = site.list_pages * site.items_per_page
+    records = _count_records('output')
+    if crawler.extractor.enabled and records != expected:
+        raise RuntimeError(f"提取到 {records} 条记录，预期 {expected} 条")
+
+
+def _run_pool(config_path, site, base_url, pool_size):
+    """用会话池并行抓取全部列表页"""
+    urls = [base_url + site.list_url(page) for page in range(1, site.list_pages + 1)]
+    results = CrawlerPool(config_path, size=pool_size).run(urls)
+    failed = [r for r in results if 'error' in r]
+    if failed:
+        raise RuntimeError(f"{len(failed)} 个页面抓取失败: {failed[0]['error']}")
+
+
+def _run_tabs(config_path, site, base_url, pool_size):
+    """在一个浏览器的多个标签页中并发抓取全部列表页"""
+    crawler = Crawler(config_path)
+    try:
+        crawler.setup_driver()
+        crawler.navigate(base_url + '/index')
+        urls = [base_url + site.list_url(page) for page in range(1, site.list_pages + 1)]
+        results = TabScheduler(crawler, size=pool_size).run(urls)
+        failed = [r for r in results if 'error' in r]
+        if failed:
+            raise RuntimeError(f"{len(failed)} 个页面抓取失败: {failed[0]['error']}")
+    finally:
+        crawler.close()
+
+
+def _run_http(config_path, site, base_url, pool_size):
+    """浏览器打开首页后导出会话，用HTTP抓取全部列表页"""
+    crawler = Crawler(config_path)
+    try:
+        crawler.setup_driver()
+        crawler.navigate(base_url + '/index')
+        urls = [base_url + site.list_url(page) for page in range(1, site.list_pages + 1)]
+        results = BrowserSessionFetcher(crawler).crawl(urls)
+        failed = [r for r in results if 'error' in r]
+        if failed:
+            raise RuntimeError(f"{len(failed)} 个页面抓取失败: {failed[0]['error']}")
+    finally:
+        crawler.close()
+
+
+RUNNERS = {'headless': _run_headless, 'pool': _run_pool, 'tabs': _run_tabs, 'http': _run_http}
+
+
+def run_mode(mode, server, base_config, pool_size):
+    """在干净的工作目录中运行一次指定模式，返回耗时、页面数和WebDriver往返统计"""
+    pagination = base_config.get('pagination', {})
+    overrides = {
+        'target_url': server.base_url + '/index',
+        'headless': True,
+        'interactive': False,
+        'pagination': dict(pagination, max_pages=max(server.site.list_pages, pagination.get('max_pages', 50))),
+        # 本地站点不需要限速，否则测得的是限速器的速率上限而不是爬虫本身的吞吐
+        'rate_limit': dict(base_config.get('rate_limit', {}), enabled=False),
+    }
+    with _workspace(base_config, overrides) as config_path:
+        server.reset_counters()
+        start = time.perf_counter()
+        RUNNERS[mode](config_path, server.site, server.base_url, pool_size)
+        elapsed = time.perf_counter() - start
+        round_trips, webdriver_seconds = _trace_totals(os.path.join('output', 'traces'))
+    return {
+        'mode': mode,
+        'seconds': round(elapsed, 3),
+        'pages': server.pages,
+        'requests': server.requests,
+        'pages_per_sec': round(server.pages / elapsed, 3) if elapsed else 0.0,
+        'webdriver_round_trips': round_trips,
+        'webdriver_seconds': round(webdriver_seconds, 3),
+    }
+
+
+def summarize(runs):
+    """按模式取各项指标的中位数"""
+    summary = {}
+    for mode in MODES:
+        mode_runs = [r for r in runs if r['mode'] == mode and 'error' not in r]
+        if not mode_runs:
+            continue
+        summary[mode] = {key: statistics.median(r[key] for r in mode_runs)
+                         for key in ('seconds', 'pages', 'pages_per_sec', 'webdriver_round_trips', 'webdriver_seconds')}
+        summary[mode]['runs'] = len(mode_runs)
+    return summary
+
+
+def run_benchmark(config_path='config.json', modes=MODES, **options):
+    """启动本地站点，按模式依次运行repeat次，返回每次的结果和按模式汇总的中位数"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        base_config = json.load(f)
+    settings = dict(DEFAULT_SETTINGS, **base_config.get('benchmark', {}))
+    settings.update({k: v for k, v in options.items() if v is not None})
+
+    site = FixtureSite(settings['list_pages'], settings['items_per_page'])
+    server = FixtureServer(site, settings['latency_ms']).start()
+    logger.info(f"基准测试站点: {server.base_url}（延迟 {settings['latency_ms']}ms，"
+                f"{settings['list_pages']} 页 x {settings['items_per_page']} 条）")
+
+    runs = []
+    try:
+        for mode in modes:
+            for i in range(settings['repeat']):
+                logger.info(f"[{mode}] 第 {i + 1}/{settings['repeat']} 次运行...")
+                try:
+                    result = run_mode(mode, server, base_config, settings['pool_size'])
+                except Exception as e:
+                    logger.error(f"[{mode}] 运行失败: {e}")
+                    result = {'mode': mode, 'error': str(e)}
+                runs.append(result)
+    finally:
+        server.stop()
+    return {'settings': settings, 'runs': runs, 'summary': summarize(runs)}
+
+
+def log_report(report):
+    """按模式输出中位数结果"""
+    logger.info("=" * 60)
+    logger.info("基准测试结果（中位数）")
+    logger.info("=" * 60)
+    for mode, stat in report['summary'].items():
+        logger.info(f"{mode:<9} 耗时 {stat['seconds']:.3f}s, 页面 {stat['pages']}, "
+                    f"{stat['pages_per_sec']:.2f} 页/秒, WebDriver往返 {stat['webdriver_round_trips']} 次 "
+                    f"({stat['webdriver_seconds']:.3f}s), 有效运行 {stat['runs']} 次")
+    failed = [r for r in report['runs'] if 'error' in r]
+    if failed:
+        logger.warning(f"⚠️  {len(failed)} 次运行失败，未计入结果")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='在本地模拟站点上测量爬虫性能')
+    parser.add_argument('--config', default='config.json', help='配置文件路径')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES), help='要测量的运行模式')
+    parser.add_argument('--repeat', type=int, default=None, help='每个模式的运行次数')
+    parser.add_argument('--latency-ms', type=int, default=None, help='每个请求的模拟网络延迟（毫秒）')
+    parser.add_argument('--list-pages', type=int, default=None, help='文献列表页数')
+    parser.add_argument('--items-per-page', type=int, default=None, help='每页文献条目数')
+    parser.add_argument('--pool-size', type=int, default=None, help='pool模式的浏览器会话数量（tabs模式的标签页数量）')
+    parser.add_argument('--output', default=None, help='将完整结果写入JSON文件')
+    parser.add_argument('--serve', action='store_true', help='只启动本地站点，用于手动检查页面')
+    args = parser.parse_args()
+
+    if args.serve:
+        fixture_site = FixtureSite(args.list_pages or DEFAULT_SETTINGS['list_pages'],
+                                   args.items_per_page or DEFAULT_SETTINGS['items_per_page'])
+        fixture_server = FixtureServer(fixture_site, args.latency_ms or 0, port=8800)
+        logger.info(f"本地站点已启动: {fixture_server.base_url}/index（Ctrl+C退出）")
+        try:
+            fixture_server.serve_forever()
+        except KeyboardInterrupt:
+            fixture_server.server_close()
+    else:
+        bench = run_benchmark(args.config, modes=args.modes, repeat=args.repeat, latency_ms=args.latency_ms,
+                              list_pages=args.list_pages, items_per_page=args.items_per_page,
+                              pool_size=args.pool_size)
+        log_report(bench)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(bench, f, ensure_ascii=False, indent=2)
+            logger.info(f"完整结果已保存: {args.output}")
@@ -0,0 +1,150 @@
+"""
+增量爬取索引：用SQLite记录每个页面的内容哈希和已发现的文献记录，跳过未变化的页面，只输出新增记录
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 计算内容哈希前去掉脚本、样式和多余空白，避免页面中的随机token导致误判为已变化
+_NOISE_PATTERN = re.compile(r'<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+_SPACE_PATTERN = re.compile(r'\s+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    last_changed REAL NOT NULL,
+    PRIMARY KEY (kind, url)
+);
+CREATE TABLE IF NOT EXISTS records (
+    record_key TEXT PRIMARY KEY,
+    source_url TEXT,
+    first_seen REAL NOT NULL
+);
+"""
+
+
+def content_hash(html_text):
+    """计算页面正文的哈希"""
+    text = _SPACE_PATTERN.sub(' ', _NOISE_PATTERN.sub('', html_text or '')).strip()
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def record_key(record):
+    """文献记录的去重键：优先DOI，其次链接，最后标题"""
+    return record.get('doi') or record.get('link') or record.get('title')
+
+
+class CrawlIndex:
+    def __init__(self, config):
+        """初始化索引，配置取config.json中的index"""
+        settings = config.get('index', {})
+        self.enabled = settings.get('enabled', True)
+        output_dir = config.get('output_directory', './output')
+        self.path = settings.get('path', os.path.join(output_dir, 'crawl_index.sqlite3'))
+        self.recrawl_after = settings.get('recrawl_after_hours', 24) * 3600
+        self._conn = None
+        # 连接可能被多个线程使用（如守护进程的任务线程），写入时加锁
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def page_unchanged(self, kind, url, html_text):
+        """页面内容与索引中记录的相同时返回True（并更新最后访问时间）"""
+        if not self.enabled:
+            return False
+        with self._lock, self.conn:
+            cursor = self.conn.execute('UPDATE pages SET last_seen = ? WHERE kind = ? AND url = ? AND content_hash = ?',
+                                       (time.time(), kind, url, content_hash(html_text)))
+            return cursor.rowcount > 0
+
+    def mark_page(self, kind, url, html_text):
+        """登记页面当前内容"""
+        if not self.enabled:
+            return
+        digest = content_hash(html_text)
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT INTO pages VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (kind, url) DO UPDATE SET content_hash = excluded.content_hash, '
+                'last_seen = excluded.last_seen, last_changed = excluded.last_changed',
+                (kind, url, digest, now, now, now)
+            )
+
+    def page_changed(self, kind, url, html_text):
+        """返回页面与上次相比是否有变化（首次出现视为有变化），并登记当前内容"""
+        if self.page_unchanged(kind, url, html_text):
+            return False
+        self.mark_page(kind, url, html_text)
+        return True
+
+    def pending_urls(self, urls, kind='page'):
+        """过滤掉在recrawl_after_hours内已抓取过的URL，用于增量爬取和中断后续爬"""
+        urls = list(urls)
+        if not self.enabled:
+            return urls
+        since = time.time() - self.recrawl_after
+        with self._lock:
+            fresh = {row[0] for row in self.conn.execute(
+                'SELECT url FROM pages WHERE kind = ? AND last_seen >= ?', (kind, since))}
+        pending = [url for url in urls if url not in fresh]
+        if len(pending) < len(urls):
+            logger.info(f"跳过 {len(urls) - len(pending)} 个近期已抓取的URL")
+        return pending
+
+    def unseen_urls(self, urls, kind):
+        """返回从未登记过的URL（不受recrawl_after_hours限制），用于跨运行去重"""
+        urls = list(dict.fromkeys(urls))
+        if not self.enabled:
+            return urls
+        with self._lock:
+            seen = {row[0] for row in self.conn.execute('SELECT url FROM pages WHERE kind = ?', (kind,))}
+        return [url for url in urls if url not in seen]
+
+    def unseen_records(self, records):
+        """返回此前从未登记过的记录（不写入索引，输出成功后再调用mark_records登记）"""
+        if not self.enabled:
+            return list(records)
+        with self._lock:
+            seen = {row[0] for row in self.conn.execute('SELECT record_key FROM records')}
+        fresh = []
+        for record in records:
+            key = record_key(record)
+            if key is None or key in seen:
+                continue
+            seen.add(key)
+            fresh.append(record)
+        return fresh
+
+    def mark_records(self, records):
+        """登记已输出的记录，之后的运行不再视为新增"""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany('INSERT OR IGNORE INTO records VALUES (?, ?, ?)',
+                                  [(record_key(record), record.get('source_url'), now)
+                                   for record in records if record_key(record) is not None])
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -5,14 +5,31 @@
 import json
 import logging
 import os
-import time
-from datetime import datetime
 from pathlib import Path
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
+from artifacts import ArtifactWriter
+from crawl_index import CrawlIndex
+from details import DetailFanout
+from export import DatasetExporter
+from extractor import LiteratureExtractor, save_records
+from html_analyzer import log_analysis
+from launcher import BrowserLauncher, chrome_user_data_dirs
+from lean_loading import LeanLoading
+from locator import locate_view_more
+from login_state import LoginStateProbe
+from memory_watchdog import MemoryWatchdog
+from metrics import Tracer, traced
+from paginator import ListingPaginator
+from rate_limiter import AdaptiveRateLimiter
+from profile_manager import copy_minimal_profile
+from readiness import PageReadiness
+from screenshots import ScreenshotEngine
+from session_cache import SessionCache
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -24,13 +41,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 爬虫专用Profile名称
+PROFILE_NAME = 'CrawlerProfile'
+
 
 class Crawler:
-    def __init__(self, config_path='config.json'):
-        """初始化爬虫"""
+    def __init__(self, config_path='config.json', profile_dir=None):
+        """初始化爬虫，profile_dir为Chrome用户数据目录（默认为项目下的chrome_profile）"""
         with open(config_path, 'r', encoding='utf-8') as f:
             self.config = json.load(f)
+        self.profile_dir = profile_dir or os.path.join(os.getcwd(), 'chrome_profile')
         self.driver = None
+        self.readiness = None
+        self.launcher = BrowserLauncher(self.config)
+        self.lean_loading = LeanLoading(self.config)
+        self.login_state = LoginStateProbe(self.config)
+        self.tracer = Tracer(self.config)
+        self.rate_limiter = AdaptiveRateLimiter(self.config)
+        self.watchdog = MemoryWatchdog(self)
+        self.session_cache = SessionCache(self.config)
+        self.extractor = LiteratureExtractor(self.config)
+        self.paginator = ListingPaginator(self)
+        self.index = CrawlIndex(self.config)
+        self.details = DetailFanout(self)
+        self.artifacts = ArtifactWriter(self.config, tracer=self.tracer)
+        self.screenshots = ScreenshotEngine(self)
+        self.exporter = DatasetExporter(self.config)
         
         # 创建输出目录
         output_dir = self.config.get('output_directory', './output')
@@ -38,10 +74,10 @@ class Crawler:
     
     def migrate_chrome_profile(self):
         """从Chrome目录迁移CrawlerProfile（如果存在）"""
-        chrome_user_data = os.path.expanduser(r'~\AppData\Local\Google\Chrome\User Data')
-        source_profile = os.path.join(chrome_user_data, 'CrawlerProfile')
-        temp_profile_dir = os.path.join(os.getcwd(), 'chrome_profile')
-        dest_profile = os.path.join(temp_profile_dir, 'CrawlerProfile')
+        # 按当前平台查找Chrome默认用户数据目录（Windows/macOS/Linux）
+        candidates = [os.path.join(d, PROFILE_NAME) for d in chrome_user_data_dirs()]
+        source_profile = next((p for p in candidates if os.path.exists(p)), None)
+        dest_profile = os.path.join(self.profile_dir, PROFILE_NAME)
         
         # 如果目标已存在
         if os.path.exists(dest_profile):
@@ -49,15 +85,19 @@ class Crawler:
             logger.info(f"路径: {dest_profile}")
             return True
         
-        # 如果源Profile存在，复制它
-        if os.path.exists(source_profile):
+        # 如果源Profile存在，只复制登录状态所需的内容（Cookie、Local Storage、Preferences）
+        if source_profile:
             logger.info(f"检测到Chrome中的CrawlerProfile，正在复制...")
             logger.info(f"源: {source_profile}")
             logger.info(f"目标: {dest_profile}")
             
             try:
                 import shutil
-                shutil.copytree(source_profile, dest_profile, dirs_exist_ok=True)
+                copy_minimal_profile(source_profile, dest_profile)
+                # Local State中保存了Cookie的加密密钥
+                local_state = os.path.join(os.path.dirname(source_profile), 'Local State')
+                if os.path.exists(local_state) and not os.path.exists(os.path.join(self.profile_dir, 'Local State')):
+                    shutil.copy2(local_state, self.profile_dir)
                 logger.info("✅ Profile复制成功！")
                 return True
             except Exception as e:
@@ -67,6 +107,7 @@ class Crawler:
             logger.info("Chrome中未找到CrawlerProfile，将创建全新Profile")
             return False
     
+    @traced('setup_driver')
     def setup_driver(self):
         """设置Chrome驱动"""
         logger.info("正在设置Chrome...")
@@ -74,8 +115,8 @@ class Crawler:
         options = Options()
         
         # 使用独立的临时目录 + 指定Profile名称
-        temp_profile_dir = os.path.join(os.getcwd(), 'chrome_profile')
-        profile_name = 'CrawlerProfile'
+        temp_profile_dir = self.profile_dir
+        profile_name = PROFILE_NAME
         os.makedirs(temp_profile_dir, exist_ok=True)
         
         # 尝试迁移Chrome中已有的Profile
@@ -90,7 +131,7 @@ class Crawler:
             logger.info("="*60)
             logger.info("")
             logger.info("请按以下步骤操作：")
-            logger.info("1. 双击运行 open_chrome.bat")
+            logger.info("1. 双击运行 open_chrome.bat（Linux/macOS: python launcher.py open）")
             logger.info("2. 在打开的Chrome中访问目标网站并完成登录")
             logger.info("3. 关闭Chrome")
             logger.info("4. 重新运行此脚本")
@@ -120,29 +161,28 @@ class Crawler:
         if self.config.get('headless', False):
             options.add_argument('--headless=new')
         
+        # Chrome路径（首次查找后缓存）和headless快速启动参数
+        self.launcher.configure_options(options)
+        
+        # 精简加载模式：eager加载策略，不加载图片
+        self.lean_loading.configure_options(options)
+        
         try:
             logger.info("正在启动Chrome浏览器...")
             logger.info("⚠️  如果长时间无响应，请检查是否有Chrome进程卡住")
             
-            # 先检查Chrome进程
-            import subprocess
-            result = subprocess.run(['tasklist', '/FI', 'IMAGENAME eq chrome.exe'], 
-                                  capture_output=True, text=True)
-            if 'chrome.exe' in result.stdout:
-                logger.warning("⚠️  检测到Chrome进程正在运行！")
-                logger.warning("   建议关闭所有Chrome窗口后重试")
-                logger.warning("   或者运行: taskkill /F /IM chrome.exe /T")
-                time.sleep(2)
+            # 先检查Profile是否被其他Chrome进程占用（读取锁文件，清理异常退出的残留锁）
+            self.launcher.prepare_profile(temp_profile_dir)
             
-            self.driver = webdriver.Chrome(options=options)
-            
-            # 移除WebDriver特征
-            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                'source': 'Object.defineProperty(navigator, "webdriver", {get: () => undefined})'
-            })
+            self.driver = webdriver.Chrome(options=options, service=self.launcher.service())
+            # 统计每个WebDriver命令的次数和往返耗时
+            self.tracer.instrument_driver(self.driver)
             
             self.driver.set_page_load_timeout(self.config.get('page_load_timeout', 30))
-            self.driver.implicitly_wait(self.config.get('implicit_wait', 10))
+            self.driver.implicitly_wait(self.config.get('implicit_wait', 0))
+            
+            self.readiness = PageReadiness(self.driver, self.config)
+            self.prepare_tab()
             
             logger.info("✅ Chrome启动成功")
             return True  # 返回成功标志
@@ -154,11 +194,26 @@ class Crawler:
             logger.error("3. 尝试重启电脑")
             raise
     
+    def prepare_tab(self):
+        """为当前标签页注入反检测脚本、请求屏蔽和就绪探针（CDP设置只作用于当前标签页，新开的标签页需再次调用）"""
+        # 移除WebDriver特征
+        self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+            'source': 'Object.defineProperty(navigator, "webdriver", {get: () => undefined})'
+        })
+        
+        # 屏蔽图片、字体、视频和统计脚本等非必要请求
+        self.lean_loading.install(self.driver)
+        
+        # 注入就绪探针，后续等待改为条件触发
+        self.readiness.install()
+        
+        # 启用性能指标，供内存看门狗采样
+        self.watchdog.install(self.driver)
+    
+    @traced('auto_login')
     def auto_login(self):
         """自动登录流程"""
         from selenium.webdriver.common.by import By
-        from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
         
         target_url = self.config.get('target_url')
         
@@ -166,10 +221,13 @@ class Crawler:
         logger.info("开始自动登录流程")
         logger.info("="*60)
         
+        # 访问页面前先恢复缓存的会话
+        restored = self.restore_session()
+        
         # 1. 访问目标页面（处理超时问题）
         logger.info(f"访问目标页面: {target_url}")
         try:
-            self.driver.get(target_url)
+            self.navigate(target_url)
         except Exception as e:
             logger.warning(f"页面加载超时，尝试停止加载: {e}")
             try:
@@ -179,12 +237,20 @@ class Crawler:
             except:
                 pass
         
-        time.sleep(3)
-        
         try:
             # 2. 等待页面加载完成
             logger.info("等待页面元素加载...")
-            time.sleep(2)
+            self.readiness.wait_for_page_ready()
+            
+            # 已恢复缓存的会话时，一次检查即可确认登录状态
+            if restored:
+                self.session_cache.restore_finished(self.driver)
+                if self.login_state.is_logged_in(self.driver):
+                    logger.info("✅ 已通过会话缓存恢复登录状态")
+                    return True
+                logger.info("会话缓存已失效，执行完整登录流程")
+                self.session_cache.clear()
+                self.login_state.invalidate()
             
             # 2. 查找登录按钮并点击（使用固定的选择器）
             logger.info("查找登录按钮...")
@@ -205,238 +271,158 @@ class Crawler:
             
             if login_button:
                 logger.info("点击登录按钮...")
-                login_button.click()
-                
-                # 等待登录跳转或完成
-                logger.info("等待登录完成...")
-                time.sleep(5)
+                # 点击会触发页面跳转，与navigate一样先经过按主机限速；手动登录的等待不占用名额
+                with self.rate_limiter.slot(target_url) as slot:
+                    login_button.click()
+                    
+                    # 等待登录跳转或完成，出现登录后关键字即返回
+                    logger.info("等待登录完成...")
+                    try:
+                        logged_in = self.login_state.wait_for_login(self.driver, self.readiness)
+                        self.check_captcha(slot)
+                    except Exception:
+                        # 如果页面跳转导致窗口关闭，等待并重新获取
+                        slot.outcome = 'error'
+                        logged_in = None
                 
                 # 检查是否已登录
-                try:
-                    current_url = self.driver.current_url
-                    page_source = self.driver.page_source
-                    
-                    # 检查是否已登录
-                    if any(keyword in page_source for keyword in ["退出", "注销", "logout"]):
-                        logger.info("✅ 自动登录成功！")
-                        return True
-                    else:
-                        logger.warning("⚠️  未检测到登录状态，可能需要手动操作")
-                        logger.info("如需手动登录，请在浏览器中操作")
-                        input("\n完成后按Enter继续...")
-                        return True
-                except:
-                    # 如果页面跳转导致窗口关闭，等待并重新获取
+                if logged_in is None:
                     logger.info("页面可能已跳转，等待稳定...")
-                    time.sleep(3)
+                    self.readiness.wait_for_page_ready()
                     return True
+                if logged_in:
+                    logger.info("✅ 自动登录成功！")
+                    self.save_session()
+                    return True
+                logger.warning("⚠️  未检测到登录状态，可能需要手动操作")
+                logger.info("如需手动登录，请在浏览器中操作")
+                return self.wait_for_user("\n完成后按Enter继续...")
             else:
                 logger.warning("⚠️  未找到登录按钮")
                 logger.info("页面可能已经是登录状态，或需要手动操作")
                 
-                # 检查是否已经登录
-                page_source = self.driver.page_source
-                if any(keyword in page_source for keyword in ["退出", "注销", "logout", "个人中心"]):
+                # 检查是否已经登录（一次脚本调用，不传输整个页面源码）
+                if self.login_state.is_logged_in(self.driver):
                     logger.info("✅ 页面已是登录状态！")
+                    self.save_session()
                     return True
                 else:
                     logger.info("如需登录，请手动操作")
-                    input("\n完成后按Enter继续...")
-                    return True
+                    return self.wait_for_user("\n完成后按Enter继续...")
                     
         except Exception as e:
             logger.error(f"登录过程出错: {e}")
             logger.info("请手动完成登录")
-            input("\n完成登录后按Enter继续...")
+            return self.wait_for_user("\n完成登录后按Enter继续...")
+    
+    def wait_for_user(self, prompt):
+        """交互模式下等待用户在终端按Enter后返回True；非交互模式（批处理、服务器）不阻塞，直接返回False"""
+        if not self.config.get('interactive', True):
+            logger.info(f"非交互模式，跳过等待: {prompt.strip()}")
+            return False
+        input(prompt)
+        return True
+    
+    def navigate(self, url):
+        """打开页面（所有页面跳转都经过这里，便于统计加载耗时和按主机限速）"""
+        with self.tracer.span('page_load', url=url), self.rate_limiter.slot(url) as slot:
+            self.driver.get(url)
+            self.check_captcha(slot)
+    
+    def captcha_found(self):
+        """检查当前页面是否为验证码页面"""
+        markers = self.rate_limiter.captcha_markers
+        if self.rate_limiter.enabled and markers and self.readiness:
+            found = self.readiness.has_text(markers)
+            if found:
+                logger.warning(f"⚠️  检测到反爬验证页面（{found}），降低访问速度")
+                return True
+        return False
+    
+    def check_captcha(self, slot):
+        """页面跳转后检查是否出现验证码页面，出现时通知限速器减速"""
+        if self.captcha_found():
+            slot.captcha()
+    
+    def restore_session(self):
+        """从会话缓存恢复Cookie和localStorage，需在访问目标页面前调用"""
+        snapshot = self.session_cache.load()
+        if not snapshot:
+            return False
+        try:
+            self.session_cache.restore(self.driver, snapshot)
             return True
+        except WebDriverException as e:
+            logger.warning(f"⚠️  恢复会话缓存失败: {e}")
+            return False
+    
+    def save_session(self):
+        """登录成功后缓存会话，供下次启动和并行会话复用"""
+        try:
+            self.session_cache.save(self.driver)
+        except (OSError, WebDriverException) as e:
+            logger.warning(f"⚠️  保存会话缓存失败: {e}")
     
+    @traced('click_view_more')
     def click_view_more(self):
         """点击最新上线的查看更多按钮"""
         from selenium.webdriver.common.by import By
-        from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
         
         logger.info("="*60)
         logger.info("开始查找并点击'查看更多'按钮")
         logger.info("="*60)
         
         try:
-            # 等待页面加载完成
-            time.sleep(3)
-            
-            # 保存点击前的页面HTML用于调试
-            timestamp_before = datetime.now().strftime('%Y%m%d_%H%M%S')
-            html_before = os.path.join(self.config.get('output_directory', './output'), f'before_click_{timestamp_before}.html')
-            with open(html_before, 'w', encoding='utf-8') as f:
-                f.write(self.driver.page_source)
-            logger.info(f"点击前页面HTML已保存: {html_before}")
-            
-            # 查找"查看更多"按钮的多种方式
-            view_more_button = None
-            
-            # 方法1: 查找包含"查看更多"文本的元素，特别针对最新上线区域
-            try:
-                logger.info("方法1: 查找包含'查看更多'文本的元素...")
-                elements = self.driver.find_elements(By.XPATH, "//*[contains(text(), '查看更多')]")
-                logger.info(f"找到 {len(elements)} 个包含'查看更多'的元素")
-                
-                for i, elem in enumerate(elements):
-                    logger.info(f"元素 {i+1}: 标签={elem.tag_name}, 文本='{elem.text}', 可见={elem.is_displayed()}")
-                    
-                    # 获取元素的完整HTML结构
-                    try:
-                        element_html = elem.get_attribute('outerHTML')
-                        logger.info(f"元素HTML: {element_html[:200]}...")
-                    except Exception as e:
-                        logger.warning(f"获取元素HTML失败: {e}")
-                    
-                    if elem.is_displayed():
-                        # 检查是否在"最新上线"区域 - 通过查找父级容器
-                        try:
-                            # 查找包含"最新上线"标题的父容器
-                            parent_container = elem.find_element(By.XPATH, "./ancestor::div[contains(@class, 'w_containt_item')]")
-                            parent_html = parent_container.get_attribute('outerHTML')
-                            
-                            if "最新上线" in parent_html:
-                                view_more_button = elem
-                                logger.info("✅ 找到'最新上线'区域的'查看更多'按钮")
-                                logger.info(f"父容器HTML片段: {parent_html[:300]}...")
-                                break
-                            else:
-                                logger.info(f"元素 {i+1} 不在'最新上线'区域")
-                                
-                        except Exception as e:
-                            logger.warning(f"检查父容器失败: {e}")
-                            
-                            # 备用方法：检查元素的父级文本
-                            try:
-                                parent = elem.find_element(By.XPATH, "./..")
-                                grandparent = elem.find_element(By.XPATH, "./../..")
-                                if "最新上线" in parent.text or "最新上线" in grandparent.text:
-                                    view_more_button = elem
-                                    logger.info("✅ 通过父级文本找到'最新上线'区域的'查看更多'按钮")
-                                    break
-                            except Exception as e2:
-                                logger.warning(f"备用检查方法失败: {e2}")
-            except Exception as e:
-                logger.warning(f"方法1失败: {e}")
-            
-            # 方法2: 查找红色按钮（根据图片描述，最新上线的查看更多是红色的）
-            if not view_more_button:
-                try:
-                    logger.info("方法2: 查找红色按钮...")
-                    # 查找具有红色样式的按钮
-                    red_buttons = self.driver.find_elements(By.XPATH, "//button[contains(@style, 'red') or contains(@class, 'red') or contains(@class, 'btn-red')]")
-                    logger.info(f"找到 {len(red_buttons)} 个红色按钮")
-                    
-                    for btn in red_buttons:
-                        if btn.is_displayed() and btn.is_enabled() and "查看更多" in btn.text:
-                            view_more_button = btn
-                            logger.info("✅ 找到红色'查看更多'按钮")
-                            break
-                except Exception as e:
-                    logger.warning(f"方法2失败: {e}")
+            # 等待页面加载完成，且"查看更多"元素已渲染
+            self.readiness.wait_for_page_ready()
+            self.readiness.wait_for_elements(By.XPATH, "//*[contains(text(), '查看更多')]", 'view_more')
+            
+            # 保存点击前的页面HTML用于调试（内容与上次相同时跳过）
+            page_source = self.driver.page_source
+            if self.index.page_changed('before_click', self.driver.current_url, page_source):
+                self.artifacts.save_html('before_click', page_source)
+            else:
+                logger.info("点击前页面与上次相同，跳过保存")
             
-            # 方法3: 查找所有按钮，然后筛选
-            if not view_more_button:
-                try:
-                    logger.info("方法3: 查找所有按钮并筛选...")
-                    all_buttons = self.driver.find_elements(By.TAG_NAME, "button")
-                    all_links = self.driver.find_elements(By.TAG_NAME, "a")
-                    all_elements = all_buttons + all_links
-                    
-                    logger.info(f"找到 {len(all_elements)} 个按钮和链接")
-                    
-                    for elem in all_elements:
-                        if elem.is_displayed() and elem.is_enabled():
-                            text = elem.text.strip()
-                            if "查看更多" in text:
-                                logger.info(f"找到'查看更多'元素: {text}")
-                                # 检查是否在最新上线区域
-                                try:
-                                    # 向上查找父元素，看是否包含"最新上线"
-                                    parent = elem.find_element(By.XPATH, "./..")
-                                    grandparent = elem.find_element(By.XPATH, "./../..")
-                                    if "最新上线" in parent.text or "最新上线" in grandparent.text:
-                                        view_more_button = elem
-                                        logger.info("✅ 确认是'最新上线'区域的'查看更多'按钮")
-                                        break
-                                except:
-                                    # 如果无法确定位置，选择第一个
-                                    if not view_more_button:
-                                        view_more_button = elem
-                                        logger.info("✅ 找到'查看更多'按钮（位置未确认）")
-                except Exception as e:
-                    logger.warning(f"方法3失败: {e}")
+            # 一次脚本调用完成全部查找（文本匹配、可见性、所在区域、红色按钮兜底）
+            logger.info("查找'最新上线'区域的'查看更多'按钮...")
+            with self.tracer.span('locate_view_more'):
+                view_more_button, locate_info = locate_view_more(self.driver)
             
             if view_more_button:
+                logger.info(f"✅ 找到'查看更多'按钮（方式: {locate_info.get('method')}）")
                 logger.info("准备点击'查看更多'按钮...")
-                logger.info(f"按钮信息: 标签={view_more_button.tag_name}, 文本='{view_more_button.text}'")
+                logger.info(f"按钮信息: 标签={locate_info.get('tag')}, 文本='{locate_info.get('text')}'")
                 
-                # 滚动到按钮位置
+                # 滚动到按钮位置（scrollIntoView为同步操作，无需等待）
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", view_more_button)
-                time.sleep(1)
                 
-                # 记录点击前的URL
+                # 记录点击前的URL和窗口数
                 url_before = self.driver.current_url
+                handles_before = len(self.driver.window_handles)
                 logger.info(f"点击前URL: {url_before}")
                 
-                # 由于这是一个span元素，可能需要特殊处理
-                # 尝试多种点击方式
-                click_success = False
-                
-                # 方法1: 直接点击
-                try:
-                    view_more_button.click()
-                    logger.info("✅ 直接点击成功")
-                    click_success = True
-                except Exception as e:
-                    logger.warning(f"直接点击失败: {e}")
-                
-                # 方法2: JavaScript点击
-                if not click_success:
-                    try:
-                        self.driver.execute_script("arguments[0].click();", view_more_button)
-                        logger.info("✅ JavaScript点击成功")
-                        click_success = True
-                    except Exception as e:
-                        logger.warning(f"JavaScript点击失败: {e}")
-                
-                # 方法3: 模拟鼠标事件
-                if not click_success:
-                    try:
-                        from selenium.webdriver.common.action_chains import ActionChains
-                        actions = ActionChains(self.driver)
-                        actions.move_to_element(view_more_button).click().perform()
-                        logger.info("✅ 鼠标事件点击成功")
-                        click_success = True
-                    except Exception as e:
-                        logger.warning(f"鼠标事件点击失败: {e}")
-                
-                # 方法4: 点击父元素
-                if not click_success:
-                    try:
-                        parent_element = view_more_button.find_element(By.XPATH, "./..")
-                        parent_element.click()
-                        logger.info("✅ 点击父元素成功")
-                        click_success = True
-                    except Exception as e:
-                        logger.warning(f"点击父元素失败: {e}")
+                # 点击会触发页面跳转，与navigate一样先经过按主机限速
+                with self.rate_limiter.slot(url_before) as slot:
+                    click_success = self._click_with_fallbacks(view_more_button)
+                    if click_success:
+                        # 等待页面跳转（URL变化或打开新窗口）
+                        with self.tracer.span('wait_navigation'):
+                            if not self.readiness.wait_for_navigation(url_before, handles_before):
+                                slot.outcome = 'timeout'
+                        self.check_captcha(slot)
                 
                 if click_success:
-                    # 等待页面跳转
-                    time.sleep(5)
-                    
                     # 检查是否成功跳转到文献列表页面
                     current_url = self.driver.current_url
                     logger.info(f"点击后URL: {current_url}")
                     
-                    # 保存点击后的页面HTML用于调试
-                    timestamp_after = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    html_after = os.path.join(self.config.get('output_directory', './output'), f'after_click_{timestamp_after}.html')
-                    with open(html_after, 'w', encoding='utf-8') as f:
-                        f.write(self.driver.page_source)
-                    logger.info(f"点击后页面HTML已保存: {html_after}")
+                    # 保存点击后的页面HTML用于调试（内容与上次相同时跳过）
+                    page_source = self.driver.page_source
+                    if self.index.page_changed('after_click', current_url, page_source):
+                        self.artifacts.save_html('after_click', page_source)
+                    else:
+                        logger.info("点击后页面与上次相同，跳过保存")
                     
                     # 检查页面标题变化
                     page_title = self.driver.title
@@ -446,6 +432,7 @@ class Crawler:
                     if len(self.driver.window_handles) > 1:
                         logger.info("检测到新窗口/标签页，切换到新窗口")
                         self.driver.switch_to.window(self.driver.window_handles[-1])
+                        self.readiness.wait_for_page_ready('navigation')
                         current_url = self.driver.current_url
                         logger.info(f"新窗口URL: {current_url}")
                     
@@ -468,48 +455,68 @@ class Crawler:
             logger.error(f"点击'查看更多'按钮过程出错: {e}")
             return False
 
+    def _click_with_fallbacks(self, element):
+        """依次尝试四种点击方式，返回是否点击成功"""
+        from selenium.webdriver.common.by import By
+        
+        # 由于这是一个span元素，可能需要特殊处理
+        # 尝试多种点击方式
+        click_success = False
+        
+        # 方法1: 直接点击
+        try:
+            with self.tracer.span('click.direct'):
+                element.click()
+            logger.info("✅ 直接点击成功")
+            click_success = True
+        except Exception as e:
+            logger.warning(f"直接点击失败: {e}")
+        
+        # 方法2: JavaScript点击
+        if not click_success:
+            try:
+                with self.tracer.span('click.javascript'):
+                    self.driver.execute_script("arguments[0].click();", element)
+                logger.info("✅ JavaScript点击成功")
+                click_success = True
+            except Exception as e:
+                logger.warning(f"JavaScript点击失败: {e}")
+        
+        # 方法3: 模拟鼠标事件
+        if not click_success:
+            try:
+                from selenium.webdriver.common.action_chains import ActionChains
+                with self.tracer.span('click.action_chains'):
+                    actions = ActionChains(self.driver)
+                    actions.move_to_element(element).click().perform()
+                logger.info("✅ 鼠标事件点击成功")
+                click_success = True
+            except Exception as e:
+                logger.warning(f"鼠标事件点击失败: {e}")
+        
+        # 方法4: 点击父元素
+        if not click_success:
+            try:
+                with self.tracer.span('click.parent'):
+                    parent_element = element.find_element(By.XPATH, "./..")
+                    parent_element.click()
+                logger.info("✅ 点击父元素成功")
+                click_success = True
+            except Exception as e:
+                logger.warning(f"点击父元素失败: {e}")
+        
+        return click_success
+    
     def analyze_html_for_debug(self, html_file_path):
-        """分析HTML文件，查找查看更多按钮的详细信息"""
+        """分析HTML文件，查找查看更多按钮的详细信息（流式单次扫描）"""
         try:
-            with open(html_file_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            logger.info(f"分析HTML文件: {html_file_path}")
-            
-            # 查找所有包含"查看更多"的元素
-            import re
-            view_more_patterns = [
-                r'<[^>]*>查看更多[^<]*</[^>]*>',
-                r'查看更多',
-                r'最新上线.*?查看更多',
-            ]
-            
-            for pattern in view_more_patterns:
-                matches = re.findall(pattern, html_content, re.IGNORECASE | re.DOTALL)
-                if matches:
-                    logger.info(f"找到匹配模式 '{pattern}': {len(matches)} 个")
-                    for i, match in enumerate(matches[:3]):  # 只显示前3个
-                        logger.info(f"  匹配 {i+1}: {match[:100]}...")
-            
-            # 查找可能的链接
-            link_patterns = [
-                r'href="[^"]*latest[^"]*"',
-                r'href="[^"]*online[^"]*"',
-                r'href="[^"]*更多[^"]*"',
-            ]
-            
-            for pattern in link_patterns:
-                matches = re.findall(pattern, html_content, re.IGNORECASE)
-                if matches:
-                    logger.info(f"找到链接模式 '{pattern}': {len(matches)} 个")
-                    for i, match in enumerate(matches[:3]):
-                        logger.info(f"  链接 {i+1}: {match}")
-            
+            return log_analysis(html_file_path)
         except Exception as e:
             logger.error(f"分析HTML文件失败: {e}")
 
+    @traced('access_page')
     def access_page(self):
-        """访问目标页面"""
+        """访问目标页面并爬取文献列表，返回是否成功进入文献列表"""
         target_url = self.config.get('target_url')
         
         try:
@@ -520,24 +527,21 @@ class Crawler:
                     logger.info(f"已在目标页面: {current_url}")
                 else:
                     logger.info(f"访问页面: {target_url}")
-                    self.driver.get(target_url)
+                    self.navigate(target_url)
             except:
                 logger.info(f"访问页面: {target_url}")
-                self.driver.get(target_url)
-            
-            time.sleep(self.config.get('wait_time', 3))
+                self.navigate(target_url)
             
-            # 保存截图
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            screenshot = os.path.join(self.config.get('output_directory', './output'), f'page_{timestamp}.png')
-            self.driver.save_screenshot(screenshot)
-            logger.info(f"截图已保存: {screenshot}")
+            self.readiness.wait_for_page_ready()
             
-            # 保存HTML
-            html_file = os.path.join(self.config.get('output_directory', './output'), f'page_{timestamp}.html')
-            with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(self.driver.page_source)
-            logger.info(f"HTML已保存: {html_file}")
+            # 页面内容与上次相同时跳过截图和HTML保存
+            page_source = self.driver.page_source
+            if self.index.page_changed('page', self.driver.current_url, page_source):
+                # 由浏览器编码截图，解码和写盘交给后台线程
+                self.screenshots.capture('page')
+                self.artifacts.save_html('page', page_source)
+            else:
+                logger.info("页面与上次相同，跳过保存截图和HTML")
             
             logger.info(f"页面标题: {self.driver.title}")
             logger.info(f"当前URL: {self.driver.current_url}")
@@ -545,43 +549,120 @@ class Crawler:
             # 点击"查看更多"按钮进入文献列表
             click_result = self.click_view_more()
             if click_result:
-                # 保存跳转后的页面
-                timestamp_after = datetime.now().strftime('%Y%m%d_%H%M%S')
-                screenshot_after = os.path.join(self.config.get('output_directory', './output'), f'literature_list_{timestamp_after}.png')
-                self.driver.save_screenshot(screenshot_after)
-                logger.info(f"文献列表页面截图已保存: {screenshot_after}")
+                page_source = self.driver.page_source
+                list_url = self.driver.current_url
+                
+                # 列表首页无变化且没有未完成的分页时，说明自上次运行以来没有新文献
+                if self.index.page_unchanged('literature_list', list_url, page_source) and not self.paginator.has_cursor():
+                    logger.info("✅ 文献列表与上次相同，没有新文献")
+                    return True
                 
-                html_file_after = os.path.join(self.config.get('output_directory', './output'), f'literature_list_{timestamp_after}.html')
-                with open(html_file_after, 'w', encoding='utf-8') as f:
-                    f.write(self.driver.page_source)
-                logger.info(f"文献列表页面HTML已保存: {html_file_after}")
+                # 在后台线程解析文献列表，与保存截图和HTML并行
+                extraction = self.extractor.submit(page_source, list_url)
+                
+                # 保存跳转后的页面
+                self.screenshots.capture('literature_list')
+                self.artifacts.save_html('literature_list', page_source)
                 
                 logger.info(f"文献列表页面标题: {self.driver.title}")
                 logger.info(f"文献列表页面URL: {self.driver.current_url}")
+                
+                # 继续爬取后续分页，翻页与提取并行
+                with self.tracer.span('pagination'):
+                    records = self.paginator.crawl(extraction)
+                new_records = self.index.unseen_records(records)
+                detail_pages = {}
+                if new_records:
+                    # 抓取新增文献的详情页，摘要、关键词和元数据合并到同一条记录中
+                    detail_pages = self.details.enrich(new_records)
+                    records_file = save_records(new_records, self.config.get('output_directory', './output'))
+                    self.exporter.write('literature', new_records)
+                    logger.info(f"✅ 提取到 {len(records)} 条文献记录，其中新增 {len(new_records)} 条: {records_file}")
+                elif records:
+                    logger.info(f"✅ 提取到 {len(records)} 条文献记录，均已在之前的运行中输出")
+                elif self.extractor.enabled:
+                    logger.warning("⚠️  未提取到文献记录，请检查config.json中的extraction选择器")
+                
+                # 记录已全部输出后再登记新增记录、详情页和列表首页，中途失败时下次运行会重新爬取并输出
+                self.index.mark_records(new_records)
+                self.details.mark(detail_pages)
+                self.index.mark_page('literature_list', list_url, page_source)
+                self.artifacts.discard()
+                return True
             else:
-                # 点击失败，分析HTML文件进行调试
+                # 点击失败，保存失败现场后分析HTML文件进行调试
+                self.save_failure_artifacts()
                 logger.info("="*60)
                 logger.info("点击失败，开始分析HTML文件进行调试")
                 logger.info("="*60)
                 
-                # 分析点击前的HTML文件
-                html_files = [f for f in os.listdir(self.config.get('output_directory', './output')) if f.startswith('before_click_') and f.endswith('.html')]
-                if html_files:
-                    latest_html = max(html_files)
-                    html_path = os.path.join(self.config.get('output_directory', './output'), latest_html)
-                    self.analyze_html_for_debug(html_path)
-                
-                # 分析点击后的HTML文件
-                html_files_after = [f for f in os.listdir(self.config.get('output_directory', './output')) if f.startswith('after_click_') and f.endswith('.html')]
-                if html_files_after:
-                    latest_html_after = max(html_files_after)
-                    html_path_after = os.path.join(self.config.get('output_directory', './output'), latest_html_after)
-                    self.analyze_html_for_debug(html_path_after)
+                # 分析点击前和点击后的HTML文件（从产物索引中取最新文件，无需列出输出目录）
+                for prefix in ('before_click', 'after_click'):
+                    html_path = self.artifacts.latest(prefix)
+                    if html_path:
+                        self.analyze_html_for_debug(html_path)
+                return False
             
         except Exception as e:
             logger.error(f"访问页面失败: {e}")
+            self.save_failure_artifacts()
             raise
     
+    def save_failure_artifacts(self):
+        """流程失败时保存暂存的页面快照和当前页面截图，并等待写盘完成"""
+        self.artifacts.flush_failure()
+        if self.driver:
+            self.screenshots.capture_failure()
+        self.artifacts.wait()
+    
+    @traced('fetch_page')
+    def fetch_page(self, url):
+        """访问指定页面并保存HTML，返回页面信息（供并行爬取使用，异常交由调用方处理）"""
+        logger.info(f"访问页面: {url}")
+        self.navigate(url)
+        self.readiness.wait_for_page_ready()
+        return self.page_result(url)
+    
+    def page_result(self, url):
+        """保存当前标签页已加载完成的页面，返回页面信息"""
+        self.session_cache.restore_finished(self.driver)
+        
+        # 内容与上次相同时不再重复保存
+        html_file = None
+        page_source = self.driver.page_source
+        changed = self.index.page_changed('page', url, page_source)
+        if changed:
+            html_file = self.artifacts.save_html('page', page_source)
+        else:
+            logger.info(f"页面无变化，跳过保存: {url}")
+        
+        result = {
+            'url': url,
+            'final_url': self.driver.current_url,
+            'title': self.driver.title,
+            'html_file': html_file,
+            'changed': changed,
+        }
+        self.exporter.write('pages', [result])
+        return result
+    
+    def close(self, keep_exporter=False):
+        """停止提取线程，写完产物和数据集，关闭索引、追踪文件和浏览器；keep_exporter用于共用数据集导出的会话池"""
+        self.extractor.shutdown()
+        self.artifacts.close()
+        if not keep_exporter:
+            self.exporter.close()
+        self.index.close()
+        self.tracer.log_summary()
+        self.tracer.close()
+        if self.driver:
+            try:
+                self.driver.quit()
+                logger.info("浏览器已关闭")
+            except Exception as e:
+                logger.warning(f"⚠️  关闭浏览器失败: {e}")
+            self.driver = None
+
     def run(self, need_login=True):
         """运行爬虫"""
         try:
@@ -601,15 +682,13 @@ class Crawler:
             logger.info("✅ 成功使用本地Profile访问页面！")
             logger.info("="*60)
             
-            # 保持浏览器打开以便查看
-            input("\n按Enter键关闭浏览器...")
+            # 交互模式下保持浏览器打开以便查看
+            self.wait_for_user("\n按Enter键关闭浏览器...")
             
         except Exception as e:
             logger.error(f"运行失败: {e}")
         finally:
-            if self.driver:
-                self.driver.quit()
-                logger.info("浏览器已关闭")
+            self.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,231 @@
+"""
+常驻浏览器守护进程：保持一个已登录的Chrome会话，通过本地socket接收爬取任务
+
+启动守护进程:  python daemon.py serve
+提交任务:      python daemon.py fetch <url>
+               python daemon.py latest
+               python daemon.py ping
+               python daemon.py metrics
+               python daemon.py stop
+"""
+
+import argparse
+import http.server
+import json
+import logging
+import socket
+import socketserver
+import sys
+import threading
+
+from selenium.common.exceptions import WebDriverException
+
+from crawler import Crawler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    """每行一个JSON请求，每个请求返回一行JSON响应"""
+
+    def handle(self):
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                response = self.server.crawler_daemon.handle(json.loads(line))
+            except Exception as e:
+                response = {'ok': False, 'error': str(e)}
+            self.wfile.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+
+class _JobServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    """GET /metrics 返回Prometheus文本格式的计数器"""
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.crawler_daemon.prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CrawlerDaemon:
+    def __init__(self, config_path='config.json'):
+        """初始化守护进程，监听地址取config.json中的daemon.host/daemon.port"""
+        self.crawler = Crawler(config_path)
+        settings = self.crawler.config.get('daemon', {})
+        self.host = settings.get('host', DEFAULT_HOST)
+        self.port = settings.get('port', DEFAULT_PORT)
+        self.metrics_port = settings.get('metrics_port')
+        self.jobs_done = 0
+        self.jobs_failed = 0
+        self.server = None
+        self.metrics_server = None
+        # 只有一个浏览器，任务串行执行
+        self._lock = threading.Lock()
+
+    def start_browser(self):
+        """启动浏览器并完成登录"""
+        if self.crawler.setup_driver() is None:
+            raise RuntimeError("Profile不存在，请先完成登录")
+        if not self.crawler.auto_login():
+            raise RuntimeError("登录失败")
+
+    def _browser_alive(self):
+        if not self.crawler.driver:
+            return False
+        try:
+            self.crawler.driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def ensure_browser(self):
+        """浏览器已崩溃或被关闭时重新启动"""
+        if self._browser_alive():
+            return
+        logger.warning("⚠️  浏览器会话不可用，正在重新启动...")
+        if self.crawler.driver:
+            try:
+                self.crawler.driver.quit()
+            except Exception:
+                pass
+            self.crawler.driver = None
+        self.start_browser()
+
+    def _reset_tabs(self):
+        """关闭任务中打开的额外窗口，回到主窗口"""
+        handles = self.crawler.driver.window_handles
+        for handle in handles[1:]:
+            self.crawler.driver.switch_to.window(handle)
+            self.crawler.driver.close()
+        self.crawler.driver.switch_to.window(handles[0])
+
+    def handle(self, request):
+        """执行一个任务请求，返回响应字典"""
+        action = request.get('action')
+        if action == 'ping':
+            return {'ok': True, 'alive': self._browser_alive(), 'jobs_done': self.jobs_done}
+        if action == 'metrics':
+            return {'ok': True, 'jobs_done': self.jobs_done, 'jobs_failed': self.jobs_failed,
+                    **self.crawler.tracer.summary()}
+        if action == 'stop':
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {'ok': True}
+
+        with self._lock:
+            self.ensure_browser()
+            try:
+                if action == 'fetch':
+                    result = self.crawler.fetch_page(request['url'])
+                elif action == 'latest':
+                    if not self.crawler.access_page():
+                        self.jobs_failed += 1
+                        return {'ok': False, 'error': '未能进入文献列表页面', 'url': self.crawler.driver.current_url}
+                    result = {'url': self.crawler.driver.current_url, 'title': self.crawler.driver.title}
+                else:
+                    return {'ok': False, 'error': f'未知的任务类型: {action}'}
+                self.jobs_done += 1
+                return dict(result, ok=True)
+            except Exception:
+                self.jobs_failed += 1
+                raise
+            finally:
+                if self._browser_alive():
+                    self._reset_tabs()
+                    self._recycle_if_needed()
+
+    def _recycle_if_needed(self):
+        """任务之间检查内存，超限时换用新标签页或重启浏览器"""
+        try:
+            self.crawler.watchdog.maybe_recycle()
+        except Exception as e:
+            # 重启失败时浏览器已不可用，下一个任务前会自动重新启动
+            logger.warning(f"⚠️  回收浏览器失败: {e}")
+
+    def prometheus_text(self):
+        """守护进程任务计数加上各步骤和WebDriver命令的累计计数器"""
+        return (
+            '# TYPE crawler_daemon_jobs_total counter\n'
+            f'crawler_daemon_jobs_total{{status="ok"}} {self.jobs_done}\n'
+            f'crawler_daemon_jobs_total{{status="error"}} {self.jobs_failed}\n'
+            + self.crawler.tracer.prometheus_text()
+        )
+
+    def _start_metrics_server(self):
+        """配置了daemon.metrics_port时，启动供Prometheus抓取的HTTP端点"""
+        if not self.metrics_port:
+            return
+        self.metrics_server = http.server.ThreadingHTTPServer((self.host, self.metrics_port), _MetricsHandler)
+        self.metrics_server.crawler_daemon = self
+        threading.Thread(target=self.metrics_server.serve_forever, daemon=True).start()
+        logger.info(f"指标端点: http://{self.host}:{self.metrics_port}/metrics")
+
+    def serve_forever(self):
+        """启动浏览器并开始接收任务，直到收到stop请求"""
+        self.start_browser()
+        self.server = _JobServer((self.host, self.port), _JobHandler)
+        self.server.crawler_daemon = self
+        logger.info(f"✅ 守护进程已启动，监听 {self.host}:{self.port}")
+        self._start_metrics_server()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if self.metrics_server:
+                self.metrics_server.shutdown()
+                self.metrics_server.server_close()
+            self.crawler.close()
+
+
+def send_job(request, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=300):
+    """向守护进程提交一个任务并返回响应"""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+        with sock.makefile('r', encoding='utf-8') as reader:
+            return json.loads(reader.readline())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='常驻浏览器守护进程')
+    parser.add_argument('action', choices=['serve', 'fetch', 'latest', 'ping', 'metrics', 'stop'])
+    parser.add_argument('url', nargs='?', help='fetch任务的页面URL')
+    parser.add_argument('--config', default='config.json', help='配置文件路径')
+    args = parser.parse_args()
+
+    if args.action == 'serve':
+        CrawlerDaemon(args.config).serve_forever()
+        sys.exit(0)
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        daemon_config = json.load(f).get('daemon', {})
+    job = {'action': args.action}
+    if args.action == 'fetch':
+        if not args.url:
+            parser.error('fetch任务需要提供url')
+        job['url'] = args.url
+    try:
+        response = send_job(job, daemon_config.get('host', DEFAULT_HOST), daemon_config.get('port', DEFAULT_PORT))
+    except OSError as e:
+        logger.error(f"❌ 无法连接守护进程: {e}")
+        sys.exit(1)
+    print(json.dumps(response, ensure_ascii=False, indent=2))
+    sys.exit(0 if response.get('ok') else 1)
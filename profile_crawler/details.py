@@ -0,0 +1,110 @@
+"""
+文献详情页扩展抓取：从列表记录中收集文献链接，复用浏览器的登录会话并发抓取详情页（按主机限速），
+提取摘要、关键词和meta元数据合并到同一条记录中，已抓取过的详情页跨运行去重
+"""
+
+import logging
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from extractor import field_value, lxml_html
+from http_fetch import BrowserSessionFetcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIELDS = {
+    'abstract': "//*[contains(@class, 'abstract')]//text()",
+    'keywords': {'xpath': "//*[contains(@class, 'keyword')]//a//text()", 'multiple': True},
+}
+
+# 保留的meta标签（name前缀），学术站点通常以citation_*或Dublin Core提供标准化元数据
+DEFAULT_META_PREFIXES = ['citation_', 'dc.', 'description']
+
+
+class DetailFanout:
+    def __init__(self, crawler):
+        """初始化详情页抓取，配置取config.json中的details"""
+        self.crawler = crawler
+        settings = crawler.config.get('details', {})
+        self.enabled = settings.get('enabled', False)
+        if self.enabled and lxml_html is None:
+            logger.warning("⚠️  未安装lxml，跳过详情页抓取（pip install lxml）")
+            self.enabled = False
+        self.fields = settings.get('fields', DEFAULT_FIELDS)
+        self.meta_prefixes = [p.lower() for p in settings.get('meta_prefixes', DEFAULT_META_PREFIXES)]
+
+    def parse(self, html_text):
+        """从详情页HTML中提取配置的字段和meta元数据"""
+        tree = lxml_html.fromstring(html_text)
+        detail = {name: field_value(tree, spec) for name, spec in self.fields.items()}
+        meta = {}
+        for node in tree.xpath('//meta[@name and @content]'):
+            name = node.get('name')
+            if any(name.lower().startswith(prefix) for prefix in self.meta_prefixes):
+                # 同名meta（如多个citation_author）合并为列表
+                value = ' '.join(node.get('content').split())
+                if name in meta:
+                    meta[name] = meta[name] if isinstance(meta[name], list) else [meta[name]]
+                    meta[name].append(value)
+                else:
+                    meta[name] = value
+        detail['meta'] = meta
+        return detail
+
+    def _browser_html(self, url):
+        """HTTP抓取失败或需要执行JS时，用浏览器打开详情页"""
+        self.crawler.navigate(url)
+        self.crawler.readiness.wait_for_page_ready()
+        return self.crawler.driver.page_source
+
+    def enrich(self, records):
+        """抓取记录中文献链接对应的详情页，将摘要、关键词和meta合并到记录中，返回成功解析的 {URL: HTML}；
+        记录输出后再调用mark登记，中途失败时下次运行会重新抓取"""
+        if not self.enabled:
+            return {}
+        by_link = {}
+        for record in records:
+            if record.get('link'):
+                by_link.setdefault(record['link'], []).append(record)
+        # 新增记录都要抓取详情：输出后记录即登记为已见，本次未抓取的之后不会再补上摘要和关键词
+        urls = self.crawler.index.unseen_urls(by_link, 'detail')
+        if not urls:
+            return {}
+
+        start = time.time()
+        fetcher = BrowserSessionFetcher(self.crawler)
+        with self.crawler.tracer.span('details.fan_out', urls=len(urls)):
+            fetcher.export_session()
+            pages = {}
+            fallback = []
+            for response in fetcher.fetch_many(urls):
+                html_text = response.get('html')
+                if response.get('status') == 200 and not fetcher.needs_browser(response['url'], html_text):
+                    pages[response['url']] = html_text
+                else:
+                    fallback.append(response['url'])
+            for url in fallback:
+                try:
+                    pages[url] = self._browser_html(url)
+                except WebDriverException as e:
+                    logger.warning(f"⚠️  详情页抓取失败 {url}: {e}")
+
+        fetched = {}
+        for url, html_text in pages.items():
+            try:
+                detail = self.parse(html_text)
+            except Exception as e:
+                logger.warning(f"⚠️  详情页解析失败 {url}: {e}")
+                continue
+            for record in by_link[url]:
+                record.update(detail)
+            fetched[url] = html_text
+        logger.info(f"✅ 详情页抓取 {len(fetched)}/{len(urls)} 个（HTTP {len(urls) - len(fallback)}，"
+                    f"浏览器 {len(fallback)}），耗时 {time.time() - start:.2f}s")
+        return fetched
+
+    def mark(self, fetched):
+        """登记已随记录输出的详情页，之后的运行不再重复抓取"""
+        for url, html_text in fetched.items():
+            self.crawler.index.mark_page('detail', url, html_text)
@@ -0,0 +1,224 @@
+"""
+数据集导出：把文献记录和页面抓取结果按抓取日期分区写入JSONL和Parquet数据集，
+每批写一个新分片、已写出的分片不再修改，manifest.json记录分区、分片、行数和schema版本，下游只需读取新增的分片
+"""
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# 记录结构变化（增删字段、类型变化）时递增，写入每一行和manifest
+SCHEMA_VERSION = 1
+
+FORMATS = ('jsonl', 'parquet')
+
+MANIFEST_NAME = 'manifest.json'
+
+# 更新manifest只需几毫秒，锁文件存在超过该时间视为持有者已崩溃遗留
+LOCK_STALE_SECONDS = 10
+
+
+def read_manifest(directory):
+    """读取数据集目录下的manifest，不存在时返回空manifest"""
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'schema_version': SCHEMA_VERSION, 'datasets': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@contextmanager
+def manifest_lock(directory):
+    """跨进程互斥更新manifest：以独占方式创建锁文件（Windows和Linux均可用），退出时删除"""
+    lock_path = os.path.join(directory, MANIFEST_NAME + '.lock')
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS:
+                    logger.warning(f"⚠️  清除遗留的manifest锁文件: {lock_path}")
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.05)
+    try:
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+def files_since(directory, dataset, since=0, fmt='jsonl'):
+    """返回某数据集在since（时间戳）之后写出的分片路径，供下游增量读取"""
+    partitions = read_manifest(directory).get('datasets', {}).get(dataset, {}).get('partitions', {})
+    paths = []
+    for partition, info in sorted(partitions.items()):
+        for name, entry in sorted(info['files'].items()):
+            if entry['format'] == fmt and entry['written_at'] > since:
+                paths.append(os.path.join(directory, dataset, partition, name))
+    return paths
+
+
+def _parquet_value(value):
+    """Parquet列需要统一类型：对象转为JSON字符串，列表元素统一为字符串"""
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, list):
+        return [v if isinstance(v, str) else json.dumps(v, ensure_ascii=False) for v in value]
+    return value
+
+
+class DatasetExporter:
+    def __init__(self, config):
+        """初始化数据集导出，配置取config.json中的export"""
+        settings = config.get('export', {})
+        output_dir = config.get('output_directory', './output')
+        self.enabled = settings.get('enabled', True)
+        self.directory = settings.get('directory', os.path.join(output_dir, 'dataset'))
+        self.formats = [fmt for fmt in settings.get('formats', ['jsonl']) if fmt in FORMATS]
+        if 'parquet' in self.formats and pyarrow is None:
+            logger.warning("⚠️  未安装pyarrow，只导出JSONL（pip install pyarrow）")
+            self.formats.remove('parquet')
+        if not self.formats:
+            self.enabled = False
+        self.batch_size = settings.get('batch_size', 500)
+        # 长时间运行（守护进程）时即使不满一批也定期写盘
+        self.flush_seconds = settings.get('flush_seconds', 60)
+        self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self._buffers = {}
+        self._last_flush = time.time()
+        self._parts = 0
+        self._lock = threading.Lock()
+
+    def write(self, dataset, rows):
+        """缓存待导出的行，满一批或距上次写盘超过flush_seconds时写盘"""
+        if not self.enabled or not rows:
+            return
+        crawled_at = time.time()
+        with self._lock:
+            buffer = self._buffers.setdefault(dataset, [])
+            for row in rows:
+                buffer.append(dict(row, _schema_version=SCHEMA_VERSION, _run_id=self.run_id,
+                                   _crawled_at=crawled_at))
+            if len(buffer) >= self.batch_size or time.time() - self._last_flush >= self.flush_seconds:
+                self._flush_locked()
+
+    def flush(self):
+        """写出所有缓存的行"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.time()
+        written = []
+        for dataset, rows in self._buffers.items():
+            by_date = {}
+            for row in rows:
+                partition = 'crawl_date=' + datetime.fromtimestamp(row['_crawled_at']).strftime('%Y-%m-%d')
+                by_date.setdefault(partition, []).append(row)
+            for partition, partition_rows in by_date.items():
+                self._parts += 1
+                for fmt in self.formats:
+                    try:
+                        name = self._write_part(dataset, partition, partition_rows, fmt)
+                    except (OSError, ValueError, TypeError) as e:
+                        logger.warning(f"⚠️  导出 {dataset}/{partition} ({fmt}) 失败: {e}")
+                        continue
+                    written.append((dataset, partition, name, fmt, len(partition_rows)))
+        self._buffers = {}
+        if written:
+            self._update_manifest(written)
+            logger.info(f"✅ 已导出 {sum(w[4] for w in written)} 行到数据集 {self.directory}")
+
+    def _write_part(self, dataset, partition, rows, fmt):
+        """写出一个分片，返回文件名；先写临时文件再改名，下游不会读到写了一半的分片"""
+        partition_dir = os.path.join(self.directory, dataset, partition)
+        os.makedirs(partition_dir, exist_ok=True)
+        name = f'part-{self.run_id}-{self._parts:04d}.{fmt}'
+        tmp_path = os.path.join(partition_dir, name + '.tmp')
+        if fmt == 'jsonl':
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        else:
+            # from_pylist只按第一行推断列，先补齐所有行出现过的字段
+            columns = list(dict.fromkeys(key for row in rows for key in row))
+            table = pyarrow.Table.from_pylist([{key: _parquet_value(row.get(key)) for key in columns} for row in rows])
+            pyarrow.parquet.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, os.path.join(partition_dir, name))
+        return name
+
+    def _update_manifest(self, written):
+        """写盘后更新manifest；在锁文件保护下读取磁盘上的最新内容再合并，多个进程写同一数据集时不丢失彼此的条目"""
+        with manifest_lock(self.directory):
+            try:
+                manifest = read_manifest(self.directory)
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️  读取数据集manifest失败，重新生成: {e}")
+                manifest = {'datasets': {}}
+            self._merge_manifest(manifest, written)
+            # 临时文件名唯一，即使锁失效也不会互相覆盖写了一半的文件
+            fd, tmp_path = tempfile.mkstemp(prefix='manifest_', suffix='.tmp', dir=self.directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, os.path.join(self.directory, MANIFEST_NAME))
+            except OSError:
+                os.remove(tmp_path)
+                raise
+
+    def _merge_manifest(self, manifest, written):
+        now = time.time()
+        if manifest.get('schema_version', SCHEMA_VERSION) != SCHEMA_VERSION:
+            logger.warning(f"⚠️  数据集schema版本由 {manifest['schema_version']} 变为 {SCHEMA_VERSION}，"
+                           f"各文件的版本见manifest")
+        manifest['schema_version'] = SCHEMA_VERSION
+        manifest['updated_at'] = now
+        for dataset, partition, name, fmt, rows in written:
+            partitions = manifest['datasets'].setdefault(dataset, {'partitions': {}})['partitions']
+            info = partitions.setdefault(partition, {'files': {}, 'rows': 0})
+            info['files'][name] = {'format': fmt, 'rows': rows, 'schema_version': SCHEMA_VERSION,
+                                   'written_at': now}
+            if fmt == self.formats[0]:
+                info['rows'] += rows
+            info['updated_at'] = now
+
+    def close(self):
+        """写出剩余的缓存"""
+        if self.enabled:
+            self.flush()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='列出数据集中在指定时间之后写出的分片')
+    parser.add_argument('dataset', choices=['literature', 'pages'], help='数据集名称')
+    parser.add_argument('--since', type=float, default=0, help='上次读取时的时间戳，只列出之后写出的分片')
+    parser.add_argument('--format', choices=FORMATS, default='jsonl', help='文件格式')
+    parser.add_argument('--config', default='config.json', help='配置文件路径')
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        exporter = DatasetExporter(json.load(f))
+    for file_path in files_since(exporter.directory, args.dataset, args.since, args.format):
+        print(file_path)
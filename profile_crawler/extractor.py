@@ -0,0 +1,98 @@
+"""
+文献列表结构化提取：用lxml在后台线程解析列表页HTML，按config.json中的选择器生成文献记录
+"""
+
+import json
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urljoin
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+logger = logging.getLogger(__name__)
+
+# 默认选择器（XPath），需根据实际页面结构在config.json的extraction中调整
+# 字段值为字符串时取所有文本拼接；为对象时可指定 multiple（返回列表）
+DEFAULT_SPEC = {
+    'item': "//div[contains(@class, 'article_item') or contains(@class, 'list_item')]",
+    'fields': {
+        'title': ".//*[contains(@class, 'title')]//text()",
+        'authors': {'xpath': ".//*[contains(@class, 'author')]//text()", 'multiple': True},
+        'journal': ".//*[contains(@class, 'journal')]//text()",
+        'date': ".//*[contains(@class, 'date') or contains(@class, 'time')]//text()",
+        'doi': ".//*[contains(@class, 'doi')]//text()",
+        'link': "(.//a[contains(@class, 'title')]/@href | .//*[contains(@class, 'title')]//a/@href)[1]",
+    },
+}
+
+DOI_PATTERN = re.compile(r'10\.\d{4,9}/[^\s"\'<>]+')
+
+
+def field_value(node, spec):
+    """按字段选择器取值：字符串选择器拼接所有文本，multiple为true时返回列表"""
+    if isinstance(spec, str):
+        spec = {'xpath': spec}
+    values = node.xpath(spec['xpath'])
+    if not isinstance(values, list):
+        values = [values]
+    texts = [' '.join(str(v).split()) for v in values]
+    texts = [t for t in texts if t]
+    if spec.get('multiple'):
+        return texts
+    return ' '.join(texts) or None
+
+
+class LiteratureExtractor:
+    def __init__(self, config):
+        """初始化提取器，选择器取config.json中的extraction"""
+        settings = config.get('extraction', {})
+        self.item_xpath = settings.get('item', DEFAULT_SPEC['item'])
+        self.fields = settings.get('fields', DEFAULT_SPEC['fields'])
+        self.enabled = settings.get('enabled', True)
+        if self.enabled and lxml_html is None:
+            logger.warning("⚠️  未安装lxml，跳过结构化提取（pip install lxml）")
+            self.enabled = False
+        self._executor = ThreadPoolExecutor(max_workers=settings.get('workers', 2),
+                                            thread_name_prefix='extractor')
+
+    def extract(self, html_text, page_url):
+        """解析页面HTML，返回文献记录列表"""
+        if not self.enabled or not html_text:
+            return []
+        tree = lxml_html.fromstring(html_text)
+        records = []
+        for item in tree.xpath(self.item_xpath):
+            record = {name: field_value(item, spec) for name, spec in self.fields.items()}
+            if record.get('link'):
+                record['link'] = urljoin(page_url, record['link'])
+            # 页面未单独列出DOI时，从链接或条目文本中识别
+            if 'doi' in record and not record['doi']:
+                match = DOI_PATTERN.search(record.get('link') or '') or DOI_PATTERN.search(item.text_content())
+                record['doi'] = match.group(0) if match else None
+            record['source_url'] = page_url
+            if any(v for k, v in record.items() if k != 'source_url'):
+                records.append(record)
+        return records
+
+    def submit(self, html_text, page_url):
+        """在后台线程中提取，返回Future"""
+        return self._executor.submit(self.extract, html_text, page_url)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+def save_records(records, output_dir, prefix='literature'):
+    """将记录写入JSON Lines文件，返回文件路径"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    path = os.path.join(output_dir, f'{prefix}_{timestamp}.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return path
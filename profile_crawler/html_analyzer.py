@@ -0,0 +1,115 @@
+"""
+调试用HTML分析：分块流式读取HTML文件，一次扫描统计所有模式，内存占用与文件大小无关
+"""
+
+import logging
+import re
+
+from artifacts import open_artifact_stream
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# 相邻分块之间保留的重叠长度，需大于任一模式的最大匹配长度
+OVERLAP = 2048
+MAX_SAMPLES = 3
+
+# 按最大长度限制的模式，保证匹配不会跨越超过OVERLAP的范围
+ELEMENT_PATTERNS = {
+    r'<[^>]*>查看更多[^<]*</[^>]*>': re.compile(r'<[^>]{0,500}>查看更多[^<]{0,500}</[^>]{0,100}>', re.IGNORECASE),
+}
+LINK_PATTERNS = {
+    r'href="[^"]*latest[^"]*"': re.compile(r'href="[^"]{0,1000}?latest[^"]{0,1000}"', re.IGNORECASE),
+    r'href="[^"]*online[^"]*"': re.compile(r'href="[^"]{0,1000}?online[^"]{0,1000}"', re.IGNORECASE),
+    r'href="[^"]*更多[^"]*"': re.compile(r'href="[^"]{0,1000}?更多[^"]{0,1000}"', re.IGNORECASE),
+}
+# "最新上线...查看更多"用关键字事件配对代替DOTALL非贪婪正则，避免大文件上的回溯
+SECTION_KEYWORD = '最新上线'
+VIEW_MORE_KEYWORD = '查看更多'
+KEYWORD_PATTERN = re.compile(f'{SECTION_KEYWORD}|{VIEW_MORE_KEYWORD}')
+SECTION_PATTERN_NAME = r'最新上线.*?查看更多'
+
+
+class _PatternStats:
+    def __init__(self):
+        self.count = 0
+        self.samples = []
+        self.end = 0
+
+    def add(self, sample, end):
+        self.count += 1
+        self.end = end
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(sample)
+
+
+def analyze_html(path, chunk_size=CHUNK_SIZE):
+    """单次扫描HTML文件，返回 {模式: (匹配数, 前几个匹配样例)}"""
+    regexes = dict(ELEMENT_PATTERNS, **LINK_PATTERNS)
+    stats = {name: _PatternStats() for name in list(ELEMENT_PATTERNS) + [VIEW_MORE_KEYWORD, SECTION_PATTERN_NAME]
+             + list(LINK_PATTERNS)}
+
+    section_sample = None  # 未配对的"最新上线"处的文本片段
+    section_start = 0
+    keyword_end = 0
+    carry = ''
+    base = 0  # carry起点在整个文件中的偏移
+
+    with open_artifact_stream(path) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            final = not chunk
+            buf = carry + chunk
+            safe_end = len(buf) if final else max(0, len(buf) - OVERLAP)
+
+            for name, regex in regexes.items():
+                stat = stats[name]
+                for m in regex.finditer(buf):
+                    if m.start() >= safe_end:
+                        break
+                    if base + m.start() < stat.end:
+                        continue
+                    stat.add(m.group(0), base + m.end())
+
+            for m in KEYWORD_PATTERN.finditer(buf):
+                if m.start() >= safe_end:
+                    break
+                pos = base + m.start()
+                if pos < keyword_end:
+                    continue
+                keyword_end = base + m.end()
+                if m.group(0) == VIEW_MORE_KEYWORD:
+                    stats[VIEW_MORE_KEYWORD].add(m.group(0), keyword_end)
+                    # 与前面最近一个未配对的"最新上线"组成一次匹配
+                    if section_sample is not None:
+                        stats[SECTION_PATTERN_NAME].add(section_sample[:keyword_end - section_start], keyword_end)
+                        section_sample = None
+                elif section_sample is None:
+                    section_start = pos
+                    section_sample = buf[m.start():m.start() + 100]
+
+            if final:
+                break
+            carry = buf[safe_end:]
+            base += safe_end
+
+    return {name: (stat.count, stat.samples) for name, stat in stats.items()}
+
+
+def log_analysis(path):
+    """分析HTML文件并按原有格式输出日志"""
+    logger.info(f"分析HTML文件: {path}")
+    report = analyze_html(path)
+    for name in list(ELEMENT_PATTERNS) + [VIEW_MORE_KEYWORD, SECTION_PATTERN_NAME]:
+        count, samples = report[name]
+        if count:
+            logger.info(f"找到匹配模式 '{name}': {count} 个")
+            for i, sample in enumerate(samples):
+                logger.info(f"  匹配 {i+1}: {sample[:100]}...")
+    for name in LINK_PATTERNS:
+        count, samples = report[name]
+        if count:
+            logger.info(f"找到链接模式 '{name}': {count} 个")
+            for i, sample in enumerate(samples):
+                logger.info(f"  链接 {i+1}: {sample}")
+    return report
@@ -0,0 +1,167 @@
+"""
+HTTP直连抓取：浏览器只负责登录，登录后导出Cookie和User-Agent，用异步长连接HTTP客户端批量抓取页面，
+需要执行JS才能渲染的页面再回退到浏览器
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+import time
+from urllib.parse import urlsplit
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+# 响应中出现这些标记说明内容由前端脚本渲染，需要浏览器
+DEFAULT_JS_MARKERS = ['<div id="app"></div>', 'You need to enable JavaScript']
+
+
+class BrowserSessionFetcher:
+    def __init__(self, crawler):
+        """初始化HTTP抓取器，配置取config.json中的http_fetch"""
+        self.crawler = crawler
+        settings = crawler.config.get('http_fetch', {})
+        self.concurrency = settings.get('concurrency', 8)
+        self.timeout = settings.get('timeout', 30)
+        self.js_markers = settings.get('js_markers', DEFAULT_JS_MARKERS)
+        self.browser_only = [re.compile(p) for p in settings.get('browser_only_patterns', [])]
+        self.user_agent = crawler.config.get('user_agent')
+        self.cookies = []
+
+    def export_session(self):
+        """从浏览器导出Cookie和实际使用的User-Agent"""
+        driver = self.crawler.driver
+        self.cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        self.user_agent = driver.execute_script("return navigator.userAgent;") or self.user_agent
+        logger.info(f"已导出浏览器会话: {len(self.cookies)} 个Cookie")
+
+    def _cookie_header(self, url):
+        """按域名、路径和secure属性筛选出该URL应携带的Cookie"""
+        parts = urlsplit(url)
+        host, path = parts.hostname or '', parts.path or '/'
+        now = time.time()
+        pairs = []
+        for cookie in self.cookies:
+            domain = cookie.get('domain', '').lstrip('.')
+            if not (host == domain or host.endswith('.' + domain)):
+                continue
+            if not path.startswith(cookie.get('path', '/')):
+                continue
+            if cookie.get('secure') and parts.scheme != 'https':
+                continue
+            if not cookie.get('session') and 0 < cookie.get('expires', -1) < now:
+                continue
+            pairs.append(f"{cookie['name']}={cookie['value']}")
+        return '; '.join(pairs)
+
+    def needs_browser(self, url, html_text=None):
+        """判断页面是否必须由浏览器渲染"""
+        if any(p.search(url) for p in self.browser_only):
+            return True
+        return html_text is not None and any(m in html_text for m in self.js_markers)
+
+    async def _fetch(self, session, semaphore, url):
+        async with semaphore:
+            # 与浏览器共用按主机的自适应限速
+            limiter = self.crawler.rate_limiter
+            host = urlsplit(url).hostname or ''
+            if limiter.enabled:
+                await limiter.acquire_async(host)
+            start = time.monotonic()
+            outcome, retry_after = 'error', None
+            headers = {'Cookie': self._cookie_header(url)}
+            try:
+                async with session.get(url, headers=headers, allow_redirects=True) as response:
+                    html_text = await response.text(errors='replace')
+                    outcome = limiter.outcome_for(response.status, html_text)
+                    retry_after = response.headers.get('Retry-After')
+                    return {'url': url, 'final_url': str(response.url), 'status': response.status, 'html': html_text}
+            except asyncio.TimeoutError as e:
+                outcome = 'timeout'
+                return {'url': url, 'error': str(e) or type(e).__name__}
+            except aiohttp.ClientError as e:
+                return {'url': url, 'error': str(e) or type(e).__name__}
+            finally:
+                if limiter.enabled:
+                    limiter.release(host, time.monotonic() - start, outcome,
+                                    int(retry_after) if retry_after and retry_after.isdigit() else None)
+
+    async def _fetch_all(self, urls):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # 长连接复用，每个主机的连接数不超过并发上限
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        headers = {'User-Agent': self.user_agent, 'Referer': self.crawler.config.get('target_url', '')}
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            return await asyncio.gather(*(self._fetch(session, semaphore, url) for url in urls))
+
+    def fetch_many(self, urls):
+        """用HTTP并发抓取URL列表，返回原始响应（含html或error）"""
+        urls = list(urls)
+        if aiohttp is None:
+            logger.warning("⚠️  未安装aiohttp，全部页面由浏览器抓取（pip install aiohttp）")
+            return [{'url': url, 'error': 'aiohttp未安装'} for url in urls]
+        return asyncio.run(self._fetch_all(urls))
+
+    def crawl(self, urls):
+        """批量抓取页面：优先HTTP，失败或需要JS的页面回退到浏览器，返回与fetch_page格式一致的结果"""
+        self.export_session()
+        urls = self.crawler.index.pending_urls(urls)
+        http_urls = [url for url in urls if not self.needs_browser(url)]
+        browser_urls = [url for url in urls if self.needs_browser(url)]
+
+        results = []
+        start = time.time()
+        for response in self.fetch_many(http_urls):
+            html_text = response.get('html')
+            if response.get('status') == 200 and not self.needs_browser(response['url'], html_text):
+                title = re.search(r'<title[^>]*>(.*?)</title>', html_text, re.IGNORECASE | re.DOTALL)
+                changed = self.crawler.index.page_changed('page', response['url'], html_text)
+                result = {
+                    'url': response['url'],
+                    'final_url': response['final_url'],
+                    'title': title.group(1).strip() if title else '',
+                    'html_file': self.crawler.artifacts.save_html('page', html_text) if changed else None,
+                    'changed': changed,
+                    'via': 'http',
+                }
+                self.crawler.exporter.write('pages', [result])
+                results.append(result)
+            else:
+                logger.info(f"回退到浏览器: {response['url']}（{response.get('status') or response.get('error')}）")
+                browser_urls.append(response['url'])
+        logger.info(f"HTTP抓取 {len(results)} 个页面，耗时 {time.time() - start:.2f}s")
+
+        for url in browser_urls:
+            try:
+                results.append(dict(self.crawler.fetch_page(url), via='browser'))
+            except Exception as e:
+                logger.error(f"浏览器抓取失败 {url}: {e}")
+                results.append({'url': url, 'error': str(e), 'via': 'browser'})
+        return results
+
+
+if __name__ == '__main__':
+    from crawler import Crawler
+
+    parser = argparse.ArgumentParser(description='登录后用HTTP批量抓取页面')
+    parser.add_argument('url_file', help='URL列表文件，每行一个URL')
+    parser.add_argument('--config', default='config.json', help='配置文件路径')
+    args = parser.parse_args()
+
+    with open(args.url_file, 'r', encoding='utf-8') as f:
+        url_list = [line.strip() for line in f if line.strip()]
+
+    crawler = Crawler(args.config)
+    try:
+        if crawler.setup_driver() and crawler.auto_login():
+            fetched = BrowserSessionFetcher(crawler).crawl(url_list)
+            failed = sum(1 for r in fetched if 'error' in r)
+            logger.info(f"✅ 抓取完成: 成功 {len(fetched) - failed} 个，失败 {failed} 个")
+    finally:
+        crawler.close()
@@ -0,0 +1,261 @@
+"""
+跨平台浏览器启动：一次性定位Chrome和chromedriver并缓存路径，直接读取Profile锁文件判断是否被占用
+（无需调用tasklist等外部命令），headless时使用精简的快速启动参数
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import sys
+
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+logger = logging.getLogger(__name__)
+
+# 各平台Chrome可执行文件的常见位置
+CHROME_CANDIDATES = {
+    'win32': [
+        os.path.join(os.environ.get('PROGRAMFILES', r'C:\Program Files'), r'Google\Chrome\Application\chrome.exe'),
+        os.path.join(os.environ.get('PROGRAMFILES(X86)', r'C:\Program Files (x86)'),
+                     r'Google\Chrome\Application\chrome.exe'),
+        os.path.join(os.environ.get('LOCALAPPDATA', ''), r'Google\Chrome\Application\chrome.exe'),
+    ],
+    'darwin': [
+        '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+        '/Applications/Chromium.app/Contents/MacOS/Chromium',
+    ],
+}
+CHROME_COMMANDS = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome']
+
+# 各平台Chrome默认用户数据目录，用于迁移已有的CrawlerProfile
+USER_DATA_CANDIDATES = {
+    'win32': [os.path.join(os.environ.get('LOCALAPPDATA', os.path.expanduser(r'~\AppData\Local')),
+                           r'Google\Chrome\User Data')],
+    'darwin': [os.path.expanduser('~/Library/Application Support/Google/Chrome')],
+    'linux': [os.path.expanduser('~/.config/google-chrome'), os.path.expanduser('~/.config/chromium')],
+}
+
+# Chrome运行时在用户数据目录中创建的单实例锁
+SINGLETON_FILES = ('SingletonLock', 'SingletonSocket', 'SingletonCookie')
+
+# headless快速启动：关闭首次运行向导、后台联网、组件更新、同步和扩展等与爬取无关的启动工作
+FAST_HEADLESS_FLAGS = [
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--disable-extensions',
+    '--disable-component-update',
+    '--disable-background-networking',
+    '--disable-sync',
+    '--disable-default-apps',
+    '--disable-features=Translate,MediaRouter,OptimizationHints',
+    '--mute-audio',
+    '--hide-scrollbars',
+]
+
+# 多标签页并发时后台标签页不降低定时器和渲染优先级，否则未激活标签页的加载和脚本会被明显拖慢
+BACKGROUND_TAB_FLAGS = [
+    '--disable-background-timer-throttling',
+    '--disable-renderer-backgrounding',
+    '--disable-backgrounding-occluded-windows',
+]
+
+
+def _platform():
+    return 'linux' if sys.platform.startswith('linux') else sys.platform
+
+
+def chrome_user_data_dirs():
+    """返回当前平台Chrome默认用户数据目录的候选列表"""
+    return USER_DATA_CANDIDATES.get(_platform(), [])
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def check_profile_lock(user_data_dir):
+    """检查用户数据目录是否被Chrome占用，返回 free / stale_removed / in_use
+
+    Linux和macOS的SingletonLock是指向"主机名-进程号"的符号链接，进程已不存在时删除残留的锁文件；
+    Windows的lockfile被运行中的Chrome独占打开，能删除即说明是残留文件
+    """
+    if _platform() == 'win32':
+        lockfile = os.path.join(user_data_dir, 'lockfile')
+        if not os.path.exists(lockfile):
+            return 'free'
+        try:
+            os.remove(lockfile)
+            return 'stale_removed'
+        except OSError:
+            return 'in_use'
+
+    lock = os.path.join(user_data_dir, 'SingletonLock')
+    if not os.path.lexists(lock):
+        return 'free'
+    try:
+        host, _, pid = os.readlink(lock).rpartition('-')
+        pid = int(pid)
+    except (OSError, ValueError):
+        host, pid = None, None
+    # 其他主机创建的锁（如共享目录）无法判断，按占用处理
+    if host is not None and host != socket.gethostname():
+        return 'in_use'
+    if pid is not None and _pid_alive(pid):
+        return 'in_use'
+    for name in SINGLETON_FILES:
+        path = os.path.join(user_data_dir, name)
+        if os.path.lexists(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"⚠️  删除残留锁文件失败 {path}: {e}")
+                return 'in_use'
+    return 'stale_removed'
+
+
+class BrowserLauncher:
+    def __init__(self, config):
+        """初始化启动器，配置取config.json中的launcher"""
+        settings = config.get('launcher', {})
+        self.chrome_binary = settings.get('chrome_binary') or os.environ.get('CHROME_BINARY')
+        self.chromedriver = settings.get('chromedriver') or os.environ.get('CHROMEDRIVER')
+        self.cache_path = settings.get('path_cache', os.path.join('chrome_profile', 'launcher_paths.json'))
+        self.fast_flags = settings.get('fast_headless_flags', True)
+        self.background_tabs = settings.get('background_tabs', True)
+        self.extra_args = settings.get('extra_args', [])
+        self.headless = config.get('headless', False)
+        self._resolved = False
+
+    def _load_cache(self):
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # 缓存的路径已失效（如浏览器升级后位置变化）时重新查找
+        return {k: v for k, v in cached.items() if v and os.path.isfile(v)}
+
+    def _save_cache(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'chrome_binary': self.chrome_binary, 'chromedriver': self.chromedriver}, f,
+                          ensure_ascii=False)
+        except OSError as e:
+            logger.warning(f"⚠️  保存浏览器路径缓存失败: {e}")
+
+    def _find_chrome(self):
+        for path in CHROME_CANDIDATES.get(_platform(), []):
+            if os.path.isfile(path):
+                return path
+        for command in CHROME_COMMANDS:
+            path = shutil.which(command)
+            if path:
+                return path
+        return None
+
+    def _find_chromedriver(self):
+        path = shutil.which('chromedriver')
+        if path:
+            return path
+        # 本机没有chromedriver时由Selenium Manager查找或下载，结果写入缓存，之后启动不再调用
+        try:
+            from selenium.webdriver.common.driver_finder import DriverFinder
+            options = Options()
+            if self.chrome_binary:
+                options.binary_location = self.chrome_binary
+            finder = DriverFinder(Service(), options)
+            self.chrome_binary = self.chrome_binary or finder.get_browser_path() or None
+            return finder.get_driver_path()
+        except Exception as e:
+            logger.warning(f"⚠️  Selenium Manager未能定位chromedriver: {e}")
+            return None
+
+    def resolve(self):
+        """定位Chrome和chromedriver，优先使用配置、环境变量和缓存，返回 (chrome路径, chromedriver路径)"""
+        if self._resolved:
+            return self.chrome_binary, self.chromedriver
+        cached = self._load_cache()
+        self.chrome_binary = self.chrome_binary or cached.get('chrome_binary')
+        self.chromedriver = self.chromedriver or cached.get('chromedriver')
+        if not (self.chrome_binary and self.chromedriver):
+            self.chrome_binary = self.chrome_binary or self._find_chrome()
+            self.chromedriver = self.chromedriver or self._find_chromedriver()
+            if self.chrome_binary or self.chromedriver:
+                self._save_cache()
+        logger.info(f"Chrome: {self.chrome_binary or '未找到（由Selenium自动查找）'}")
+        logger.info(f"chromedriver: {self.chromedriver or '未找到（由Selenium自动查找）'}")
+        self._resolved = True
+        return self.chrome_binary, self.chromedriver
+
+    def prepare_profile(self, user_data_dir):
+        """启动前检查Profile锁，清理已退出的Chrome留下的锁文件，返回Profile是否可用"""
+        state = check_profile_lock(user_data_dir)
+        if state == 'stale_removed':
+            logger.info("已清理上次异常退出残留的Profile锁")
+        elif state == 'in_use':
+            logger.warning("⚠️  Profile正被另一个Chrome进程使用！")
+            logger.warning("   请关闭使用该Profile的Chrome窗口后重试")
+        return state != 'in_use'
+
+    def configure_options(self, options):
+        """设置Chrome可执行文件路径，headless时加入快速启动参数，并关闭后台标签页降速"""
+        chrome_binary, _ = self.resolve()
+        if chrome_binary:
+            options.binary_location = chrome_binary
+        if self.headless and self.fast_flags:
+            for flag in FAST_HEADLESS_FLAGS:
+                options.add_argument(flag)
+        if self.background_tabs:
+            for flag in BACKGROUND_TAB_FLAGS:
+                options.add_argument(flag)
+        for arg in self.extra_args:
+            options.add_argument(arg)
+
+    def service(self):
+        """返回指定了chromedriver路径的Service，跳过每次启动时的Selenium Manager查找"""
+        _, chromedriver = self.resolve()
+        return Service(executable_path=chromedriver) if chromedriver else Service()
+
+    def open_profile(self, user_data_dir, profile_name):
+        """用爬虫Profile打开一个普通的Chrome窗口，用于手动登录（跨平台版的open_chrome.bat）"""
+        chrome_binary, _ = self.resolve()
+        if not chrome_binary:
+            raise RuntimeError("未找到Chrome，请在config.json的launcher.chrome_binary中指定路径")
+        os.makedirs(user_data_dir, exist_ok=True)
+        return subprocess.Popen([chrome_binary, f'--user-data-dir={user_data_dir}',
+                                 f'--profile-directory={profile_name}'])
+
+
+if __name__ == '__main__':
+    from crawler import PROFILE_NAME
+
+    parser = argparse.ArgumentParser(description='定位Chrome并检查Profile状态，或用爬虫Profile打开Chrome')
+    parser.add_argument('action', nargs='?', choices=['check', 'open'], default='check')
+    parser.add_argument('--config', default='config.json', help='配置文件路径')
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        launcher_config = json.load(f)
+    launcher = BrowserLauncher(launcher_config)
+    profile_dir = os.path.join(os.getcwd(), 'chrome_profile')
+    if args.action == 'open':
+        logger.info("正在用爬虫Profile启动Chrome，登录完成后关闭窗口即可")
+        launcher.open_profile(profile_dir, PROFILE_NAME).wait()
+        logger.info("Chrome已关闭")
+    else:
+        launcher.resolve()
+        logger.info(f"Profile锁状态: {check_profile_lock(profile_dir)}")
@@ -0,0 +1,79 @@
+"""
+精简加载模式：eager页面加载策略 + CDP Network.setBlockedURLs按资源类型和域名屏蔽非必要请求，
+站点自身的脚本不屏蔽，保证登录和"查看更多"跳转正常
+"""
+
+import logging
+
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+# 各资源类型对应的文件扩展名，setBlockedURLs只能按URL匹配，类型通过扩展名识别
+RESOURCE_EXTENSIONS = {
+    'image': ['png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'bmp'],
+    'font': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'media': ['mp4', 'webm', 'm3u8', 'mp3', 'flv', 'avi'],
+    'stylesheet': ['css'],
+}
+
+DEFAULT_BLOCK_TYPES = ['image', 'font', 'media']
+
+# 统计和广告脚本与页面功能无关，按域名屏蔽
+DEFAULT_BLOCK_DOMAINS = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*hm.baidu.com*',
+    '*cnzz.com*',
+    '*51.la*',
+]
+
+PAGE_LOAD_STRATEGIES = ('normal', 'eager', 'none')
+
+
+class LeanLoading:
+    def __init__(self, config):
+        """初始化精简加载配置，取config.json中的lean_loading"""
+        settings = config.get('lean_loading', {})
+        self.enabled = settings.get('enabled', False)
+        self.page_load_strategy = settings.get('page_load_strategy', 'eager')
+        if self.page_load_strategy not in PAGE_LOAD_STRATEGIES:
+            logger.warning(f"⚠️  未知的lean_loading.page_load_strategy: {self.page_load_strategy}，使用eager")
+            self.page_load_strategy = 'eager'
+        self.block_types = settings.get('block_types', DEFAULT_BLOCK_TYPES)
+        self.block_domains = settings.get('block_domains', DEFAULT_BLOCK_DOMAINS)
+        self.extra_patterns = settings.get('block_patterns', [])
+
+    def blocked_patterns(self):
+        """生成传给Network.setBlockedURLs的URL模式列表"""
+        patterns = []
+        for resource_type in self.block_types:
+            extensions = RESOURCE_EXTENSIONS.get(resource_type)
+            if extensions is None:
+                logger.warning(f"⚠️  未知的资源类型: {resource_type}")
+                continue
+            for ext in extensions:
+                # 带查询参数的资源（如 logo.png?v=2）也要匹配
+                patterns.extend([f'*.{ext}', f'*.{ext}?*'])
+        return patterns + list(self.block_domains) + list(self.extra_patterns)
+
+    def configure_options(self, options):
+        """启动前设置页面加载策略；屏蔽图片时同时关闭图片解码（只作用于本次启动，不写入Profile）"""
+        if not self.enabled:
+            return
+        options.page_load_strategy = self.page_load_strategy
+        if 'image' in self.block_types:
+            options.add_argument('--blink-settings=imagesEnabled=false')
+
+    def install(self, driver):
+        """在当前标签页启用请求屏蔽，切换到新标签页后需再次调用"""
+        if not self.enabled:
+            return
+        patterns = self.blocked_patterns()
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+            logger.info(f"✅ 精简加载已启用: 页面加载策略 {self.page_load_strategy}，屏蔽 {len(patterns)} 个URL模式")
+        except WebDriverException as e:
+            logger.warning(f"⚠️  启用请求屏蔽失败，按正常方式加载: {e}")
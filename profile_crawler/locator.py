@@ -0,0 +1,95 @@
+"""
+"查看更多"按钮定位：在浏览器内一次execute_script完成全部查找，避免逐元素的WebDriver往返
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 按原有三种方法的顺序查找：
+#   1. 文本包含关键字的元素，其w_containt_item父容器（或父级/祖父级文本）包含区域标题
+#   2. 红色样式的按钮
+#   3. 所有button和a，优先选择父级文本包含区域标题的，否则取第一个
+# 返回 {element, method, tag, text, scanned, candidates}，candidates为候选元素的简要诊断信息
+VIEW_MORE_LOCATOR_SCRIPT = r"""
+var keyword = arguments[0], section = arguments[1], maxCandidates = arguments[2];
+var candidates = [], scanned = 0;
+
+function isVisible(el) {
+    if (!el.getClientRects().length) { return false; }
+    var style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none' && style.opacity !== '0';
+}
+function isEnabled(el) { return !el.disabled; }
+function textOf(el) { return (el.innerText || el.textContent || '').trim(); }
+function parentsHaveSection(el) {
+    var parent = el.parentElement, grandparent = parent && parent.parentElement;
+    return !!((parent && textOf(parent).indexOf(section) !== -1) ||
+              (grandparent && textOf(grandparent).indexOf(section) !== -1));
+}
+function record(el, extra) {
+    scanned++;
+    if (candidates.length >= maxCandidates) { return; }
+    var info = {tag: el.tagName.toLowerCase(), text: textOf(el).slice(0, 50),
+                visible: isVisible(el), html: el.outerHTML.slice(0, 200)};
+    for (var k in extra) { info[k] = extra[k]; }
+    candidates.push(info);
+}
+function result(el, method) {
+    return {element: el, method: method, scanned: scanned, candidates: candidates,
+            tag: el ? el.tagName.toLowerCase() : null, text: el ? textOf(el).slice(0, 50) : null};
+}
+
+// 方法1: 包含关键字文本的元素，检查是否位于区域容器内
+var snapshot = document.evaluate("//*[contains(text(), '" + keyword + "')]", document, null,
+                                 XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+for (var i = 0; i < snapshot.snapshotLength; i++) {
+    var el = snapshot.snapshotItem(i);
+    var container = el.closest('div[class*="w_containt_item"]');
+    var inSection = container ? container.innerHTML.indexOf(section) !== -1 : parentsHaveSection(el);
+    record(el, {method: 1, container: !!container, in_section: inSection});
+    if (isVisible(el) && inSection) {
+        return result(el, container ? 'section_container' : 'parent_text');
+    }
+}
+
+// 方法2: 红色按钮
+var red = document.querySelectorAll('button[style*="red"], button[class*="red"]');
+for (var j = 0; j < red.length; j++) {
+    var btn = red[j];
+    record(btn, {method: 2});
+    if (isVisible(btn) && isEnabled(btn) && textOf(btn).indexOf(keyword) !== -1) {
+        return result(btn, 'red_button');
+    }
+}
+
+// 方法3: 所有按钮和链接
+var fallback = null;
+var all = Array.prototype.slice.call(document.getElementsByTagName('button'))
+    .concat(Array.prototype.slice.call(document.getElementsByTagName('a')));
+for (var n = 0; n < all.length; n++) {
+    var item = all[n];
+    if (textOf(item).indexOf(keyword) === -1 || !isVisible(item) || !isEnabled(item)) { continue; }
+    record(item, {method: 3});
+    if (parentsHaveSection(item)) { return result(item, 'button_scan'); }
+    // 只有无法确定位置（缺少父级或祖父级）时才作为备选，父级已确认不在区域内的属于其他区域，不能点击
+    if (!(item.parentElement && item.parentElement.parentElement)) {
+        fallback = fallback || item;
+    }
+}
+return result(fallback, fallback ? 'button_scan_unconfirmed' : null);
+"""
+
+
+def locate_view_more(driver, keyword='查看更多', section='最新上线', max_candidates=10):
+    """定位区域内的"查看更多"按钮，返回 (元素或None, 诊断信息)"""
+    found = driver.execute_script(VIEW_MORE_LOCATOR_SCRIPT, keyword, section, max_candidates) or {}
+    element = found.pop('element', None)
+
+    logger.info(f"共检查 {found.get('scanned', 0)} 个候选元素，命中方式: {found.get('method')}")
+    for i, candidate in enumerate(found.get('candidates', [])):
+        logger.info(f"候选 {i+1}: 方法{candidate.get('method')}, 标签={candidate.get('tag')}, "
+                    f"文本='{candidate.get('text')}', 可见={candidate.get('visible')}, "
+                    f"在区域内={candidate.get('in_section')}")
+        logger.debug(f"候选 {i+1} HTML: {candidate.get('html')}...")
+    return element, found
@@ -0,0 +1,88 @@
+"""
+登录状态检测：按config.json中配置的指标（Cookie名、DOM选择器、关键字）一次脚本调用完成判断，
+结果按浏览器会话缓存，不再传输整个page_source
+"""
+
+import logging
+
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEYWORDS = ['退出', '注销', 'logout', '个人中心']
+
+# 依次检查选择器、关键字和非httpOnly的Cookie，返回命中的指标描述，均未命中返回null
+LOGIN_STATE_SCRIPT = r"""
+var selectors = arguments[0], keywords = arguments[1], cookieNames = arguments[2];
+for (var i = 0; i < selectors.length; i++) {
+    try {
+        if (document.querySelector(selectors[i])) { return 'selector:' + selectors[i]; }
+    } catch (e) {}
+}
+var html = document.documentElement ? document.documentElement.innerHTML : '';
+for (var j = 0; j < keywords.length; j++) {
+    if (html.indexOf(keywords[j]) !== -1) { return 'keyword:' + keywords[j]; }
+}
+var cookies = '; ' + document.cookie;
+for (var k = 0; k < cookieNames.length; k++) {
+    if (cookies.indexOf('; ' + cookieNames[k] + '=') !== -1) { return 'cookie:' + cookieNames[k]; }
+}
+return null;
+"""
+
+
+class LoginStateProbe:
+    def __init__(self, config):
+        """初始化登录状态检测，指标取config.json中的login_state"""
+        settings = config.get('login_state', {})
+        self.cookie_names = settings.get('cookie_names', [])
+        self.selectors = settings.get('selectors', [])
+        self.keywords = settings.get('keywords', DEFAULT_KEYWORDS)
+        # 已确认登录的浏览器会话ID，同一会话内不再重复检查
+        self._confirmed_session = None
+
+    def _has_login_cookie(self, driver):
+        """通过CDP检查当前页面的Cookie（可读到httpOnly的登录Cookie）"""
+        cookies = driver.execute_cdp_cmd('Network.getCookies', {'urls': [driver.current_url]}).get('cookies', [])
+        names = {cookie['name'] for cookie in cookies}
+        for name in self.cookie_names:
+            if name in names:
+                return f'cookie:{name}'
+        return None
+
+    def check(self, driver):
+        """检查当前页面是否为登录状态，返回命中的指标（如 keyword:退出），未登录返回None"""
+        indicator = None
+        if self.cookie_names:
+            indicator = self._has_login_cookie(driver)
+        if indicator is None and (self.selectors or self.keywords):
+            indicator = driver.execute_script(LOGIN_STATE_SCRIPT, self.selectors, self.keywords, self.cookie_names)
+        if indicator:
+            self._confirmed_session = driver.session_id
+        return indicator
+
+    def is_logged_in(self, driver):
+        """返回是否已登录，本会话已确认登录时直接返回缓存结果"""
+        if self._confirmed_session is not None and self._confirmed_session == driver.session_id:
+            return True
+        try:
+            indicator = self.check(driver)
+        except WebDriverException as e:
+            logger.warning(f"⚠️  检查登录状态失败: {e}")
+            return False
+        if indicator:
+            logger.info(f"登录状态指标命中: {indicator}")
+        return bool(indicator)
+
+    def wait_for_login(self, driver, readiness, step='login_complete'):
+        """等待出现登录状态指标，返回是否已登录"""
+        if self._confirmed_session is not None and self._confirmed_session == driver.session_id:
+            return True
+        indicator = readiness.wait_until(lambda d: self.check(d), step, "登录状态")
+        if indicator:
+            logger.info(f"登录状态指标命中: {indicator}")
+        return bool(indicator)
+
+    def invalidate(self):
+        """清除缓存的登录状态（如会话缓存失效、重新登录前）"""
+        self._confirmed_session = None
@@ -0,0 +1,153 @@
+"""
+内存看门狗：每处理若干页面通过CDP Performance.getMetrics采样当前标签页的JS堆和DOM节点数，
+并统计Chrome进程树的内存；超过阈值时换用新标签页，仍不下降或整个浏览器超限时重启浏览器，
+恢复登录会话并回到原来的页面，保证长时间运行时每页耗时不随运行时间增长
+"""
+
+import logging
+
+from selenium.common.exceptions import WebDriverException
+
+from tabs import new_tab
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Performance.getMetrics中需要的指标
+SAMPLED_METRICS = ('JSHeapUsedSize', 'JSHeapTotalSize', 'Nodes', 'JSEventListeners', 'Documents')
+
+
+class MemoryWatchdog:
+    def __init__(self, crawler):
+        """初始化看门狗，配置取config.json中的memory_watchdog"""
+        self.crawler = crawler
+        settings = crawler.config.get('memory_watchdog', {})
+        self.enabled = settings.get('enabled', True)
+        self.check_every = max(1, settings.get('check_every', 20))
+        self.max_heap_mb = settings.get('max_heap_mb', 512)
+        self.max_dom_nodes = settings.get('max_dom_nodes', 150000)
+        self.max_browser_mb = settings.get('max_browser_mb', 3072)
+        if self.enabled and self.max_browser_mb and psutil is None:
+            logger.warning("⚠️  未安装psutil，不检查浏览器进程内存（pip install psutil）")
+        self.pages = 0
+        self.tab_recycled = False
+        self.last_sample = {}
+
+    def install(self, driver):
+        """在当前标签页启用性能指标，切换到新标签页后需再次调用"""
+        if not self.enabled:
+            return
+        try:
+            driver.execute_cdp_cmd('Performance.enable', {})
+        except WebDriverException as e:
+            logger.warning(f"⚠️  启用性能指标失败，不检查标签页内存: {e}")
+
+    def _browser_mb(self):
+        """chromedriver启动的Chrome进程树（浏览器、渲染、GPU等进程）的常驻内存合计"""
+        service = getattr(self.crawler.driver, 'service', None)
+        process = getattr(service, 'process', None)
+        if psutil is None or process is None:
+            return None
+        try:
+            children = psutil.Process(process.pid).children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for child in children:
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / MB
+
+    def sample(self):
+        """采样当前标签页和浏览器进程的内存指标"""
+        result = self.crawler.driver.execute_cdp_cmd('Performance.getMetrics', {})
+        metrics = {m['name']: m['value'] for m in result.get('metrics', []) if m['name'] in SAMPLED_METRICS}
+        sample = {
+            'heap_mb': round(metrics.get('JSHeapUsedSize', 0) / MB, 1),
+            'dom_nodes': int(metrics.get('Nodes', 0)),
+            'listeners': int(metrics.get('JSEventListeners', 0)),
+            'documents': int(metrics.get('Documents', 0)),
+        }
+        browser_mb = self._browser_mb() if self.max_browser_mb else None
+        if browser_mb is not None:
+            sample['browser_mb'] = round(browser_mb, 1)
+        self.last_sample = sample
+        return sample
+
+    def check(self):
+        """每处理check_every个页面采样一次，返回需要的回收动作：None、'tab' 或 'browser'"""
+        if not self.enabled:
+            return None
+        self.pages += 1
+        if self.pages % self.check_every:
+            return None
+        try:
+            sample = self.sample()
+        except WebDriverException as e:
+            logger.warning(f"⚠️  采样内存指标失败: {e}")
+            return None
+
+        if self.max_browser_mb and sample.get('browser_mb', 0) > self.max_browser_mb:
+            logger.warning(f"⚠️  浏览器内存 {sample['browser_mb']}MB 超过 {self.max_browser_mb}MB，重启浏览器")
+            return 'browser'
+        over_heap = self.max_heap_mb and sample['heap_mb'] > self.max_heap_mb
+        over_nodes = self.max_dom_nodes and sample['dom_nodes'] > self.max_dom_nodes
+        if not (over_heap or over_nodes):
+            self.tab_recycled = False
+            return None
+        logger.warning(f"⚠️  标签页内存超限: JS堆 {sample['heap_mb']}MB，DOM节点 {sample['dom_nodes']}")
+        # 换过标签页后仍然超限，说明泄漏不在页面本身，重启整个浏览器
+        return 'browser' if self.tab_recycled else 'tab'
+
+    def recycle(self, action, url=None):
+        """执行回收动作，完成后当前标签页停在url（未提供时为空白页）"""
+        if action == 'tab':
+            with self.crawler.tracer.span('watchdog.recycle_tab'):
+                self._recycle_tab()
+            self.tab_recycled = True
+        else:
+            with self.crawler.tracer.span('watchdog.restart_browser'):
+                self._restart_browser()
+            self.tab_recycled = False
+        if url:
+            self.crawler.navigate(url)
+            self.crawler.readiness.wait_for_page_ready()
+            self.crawler.session_cache.restore_finished(self.crawler.driver)
+
+    def maybe_recycle(self, url=None):
+        """检查内存，超限时回收并回到url，返回执行的动作（未回收返回None）"""
+        action = self.check()
+        if action:
+            self.recycle(action, url)
+        return action
+
+    def _recycle_tab(self):
+        """新建标签页替换当前标签页，旧标签页的渲染进程随之释放"""
+        driver = self.crawler.driver
+        old_handle = driver.current_window_handle
+        new_handle = new_tab(driver, background=False)
+        driver.switch_to.window(old_handle)
+        driver.close()
+        driver.switch_to.window(new_handle)
+        self.crawler.prepare_tab()
+        logger.info("✅ 已换用新标签页")
+
+    def _restart_browser(self):
+        """关闭并重新启动浏览器，从会话缓存恢复登录状态"""
+        try:
+            self.crawler.driver.quit()
+        except Exception as e:
+            logger.warning(f"⚠️  关闭浏览器失败: {e}")
+        self.crawler.driver = None
+        if self.crawler.setup_driver() is None:
+            raise RuntimeError("Profile不存在，无法重启浏览器")
+        self.crawler.restore_session()
+        logger.info("✅ 浏览器已重启")
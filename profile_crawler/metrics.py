@@ -0,0 +1,187 @@
+"""
+耗时统计：记录每个步骤的耗时区间（span）和每次WebDriver往返，按运行写出JSON Lines追踪文件，
+并可输出Prometheus文本格式的计数器
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# 追踪事件累计到一定数量后写盘
+FLUSH_EVERY = 100
+
+
+class _Counter:
+    __slots__ = ('count', 'seconds', 'errors')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.errors = 0
+
+
+class Tracer:
+    def __init__(self, config):
+        """初始化追踪器，配置取config.json中的metrics"""
+        settings = config.get('metrics', {})
+        self.enabled = settings.get('enabled', True)
+        self.trace_commands = settings.get('trace_commands', False)
+        output_dir = config.get('output_directory', './output')
+        self.trace_dir = settings.get('trace_directory', os.path.join(output_dir, 'traces'))
+        self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+        self.spans = defaultdict(_Counter)
+        self.commands = defaultdict(_Counter)
+        self._events = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def trace_path(self):
+        return os.path.join(self.trace_dir, f'trace_{self.run_id}.jsonl')
+
+    def _emit(self, event):
+        with self._lock:
+            self._events.append(event)
+            if len(self._events) >= FLUSH_EVERY:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._events:
+            return
+        try:
+            os.makedirs(self.trace_dir, exist_ok=True)
+            with open(self.trace_path, 'a', encoding='utf-8') as f:
+                for event in self._events:
+                    f.write(json.dumps(event, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logger.warning(f"⚠️  写入追踪文件失败: {e}")
+        self._events = []
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """记录一个步骤的耗时，支持嵌套；步骤抛出异常时标记为error并继续抛出"""
+        if not self.enabled:
+            yield
+            return
+        stack = self._local.__dict__.setdefault('stack', [])
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        start_wall = time.time()
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            yield
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            stack.pop()
+            with self._lock:
+                counter = self.spans[name]
+                counter.count += 1
+                counter.seconds += duration
+                counter.errors += status == 'error'
+            event = {'type': 'span', 'name': name, 'parent': parent, 'start': start_wall,
+                     'duration_ms': round(duration * 1000, 3), 'status': status}
+            if attrs:
+                event['attrs'] = attrs
+            self._emit(event)
+
+    def instrument_driver(self, driver):
+        """包装driver.execute，统计每个WebDriver命令的次数和往返耗时"""
+        if not self.enabled:
+            return driver
+        original = driver.execute
+
+        def execute(driver_command, params=None):
+            start = time.perf_counter()
+            failed = False
+            try:
+                return original(driver_command, params)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                with self._lock:
+                    counter = self.commands[driver_command]
+                    counter.count += 1
+                    counter.seconds += duration
+                    counter.errors += failed
+                if self.trace_commands:
+                    stack = self._local.__dict__.get('stack')
+                    self._emit({'type': 'command', 'name': driver_command,
+                                'parent': stack[-1] if stack else None,
+                                'duration_ms': round(duration * 1000, 3), 'status': 'error' if failed else 'ok'})
+
+        driver.execute = execute
+        return driver
+
+    def summary(self):
+        """返回各步骤和WebDriver命令的累计统计"""
+        with self._lock:
+            return {
+                'spans': {k: {'count': c.count, 'seconds': round(c.seconds, 6), 'errors': c.errors}
+                          for k, c in self.spans.items()},
+                'commands': {k: {'count': c.count, 'seconds': round(c.seconds, 6), 'errors': c.errors}
+                             for k, c in self.commands.items()},
+            }
+
+    def prometheus_text(self):
+        """以Prometheus文本格式输出累计计数器"""
+        lines = []
+        with self._lock:
+            groups = (
+                ('crawler_step', 'name', self.spans),
+                ('crawler_webdriver_command', 'command', self.commands),
+            )
+            for metric, label, counters in groups:
+                lines.append(f'# TYPE {metric}_total counter')
+                lines.extend(f'{metric}_total{{{label}="{k}"}} {c.count}' for k, c in counters.items())
+                lines.append(f'# TYPE {metric}_seconds_total counter')
+                lines.extend(f'{metric}_seconds_total{{{label}="{k}"}} {c.seconds:.6f}' for k, c in counters.items())
+                lines.append(f'# TYPE {metric}_errors_total counter')
+                lines.extend(f'{metric}_errors_total{{{label}="{k}"}} {c.errors}' for k, c in counters.items())
+        return '\n'.join(lines) + '\n'
+
+    def log_summary(self):
+        """在日志中输出耗时最多的步骤和WebDriver命令"""
+        if not self.enabled:
+            return
+        summary = self.summary()
+        for title, key in (('步骤耗时', 'spans'), ('WebDriver命令', 'commands')):
+            items = sorted(summary[key].items(), key=lambda kv: kv[1]['seconds'], reverse=True)[:10]
+            if items:
+                logger.info(f"{title}（前{len(items)}项）:")
+                for name, stat in items:
+                    logger.info(f"  {name}: {stat['count']} 次, {stat['seconds']:.3f}s, 失败 {stat['errors']} 次")
+
+    def close(self):
+        """写出统计汇总和剩余的追踪事件"""
+        if not self.enabled:
+            return
+        self._emit({'type': 'summary', 'run_id': self.run_id, 'time': time.time(), **self.summary()})
+        with self._lock:
+            self._flush_locked()
+
+
+def traced(name):
+    """方法装饰器：用所属对象的tracer记录方法耗时"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
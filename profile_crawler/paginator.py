@@ -0,0 +1,184 @@
+"""
+文献列表分页爬取：逐页翻页（或滚动加载到底），翻页与上一页的结构化提取并行进行，支持页数上限和断点续爬
+"""
+
+import json
+import logging
+import os
+import time
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+from crawl_index import record_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NEXT_XPATH = (
+    "//button[contains(@class, 'btn-next') and not(@disabled)]"
+    " | //*[normalize-space(text())='下一页' and not(contains(@class, 'disabled'))]"
+)
+
+# 列表签名：URL + 条目数 + 首条文本，用于判断翻页或滚动加载是否完成
+LISTING_SIGNATURE_SCRIPT = r"""
+var items = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var first = items.snapshotLength ? (items.snapshotItem(0).textContent || '').slice(0, 200) : '';
+return location.href + '|' + items.snapshotLength + '|' + first;
+"""
+
+SCROLL_TO_BOTTOM_SCRIPT = "window.scrollTo(0, document.body.scrollHeight);"
+
+
+class ListingPaginator:
+    def __init__(self, crawler):
+        """初始化分页器，配置取config.json中的pagination"""
+        self.crawler = crawler
+        settings = crawler.config.get('pagination', {})
+        self.enabled = settings.get('enabled', True)
+        self.mode = settings.get('mode', 'next_button')
+        self.max_pages = settings.get('max_pages', 50)
+        self.next_xpath = settings.get('next_xpath', DEFAULT_NEXT_XPATH)
+        output_dir = crawler.config.get('output_directory', './output')
+        self.cursor_file = settings.get('cursor_file', os.path.join(output_dir, 'pagination_cursor.json'))
+        self._start_url = None
+
+    @property
+    def driver(self):
+        return self.crawler.driver
+
+    def _signature(self):
+        return self.driver.execute_script(LISTING_SIGNATURE_SCRIPT, self.crawler.extractor.item_xpath)
+
+    def _load_cursor(self):
+        if not os.path.exists(self.cursor_file):
+            return None
+        try:
+            with open(self.cursor_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  读取分页断点失败: {e}")
+            return None
+
+    def _save_cursor(self, start_url, page):
+        with open(self.cursor_file, 'w', encoding='utf-8') as f:
+            json.dump({'start_url': start_url, 'page': page, 'url': self.driver.current_url,
+                       'updated_at': time.time()}, f, ensure_ascii=False)
+
+    def has_cursor(self):
+        """是否存在未完成的分页断点"""
+        return self.enabled and os.path.exists(self.cursor_file)
+
+    def _clear_cursor(self):
+        if os.path.exists(self.cursor_file):
+            os.remove(self.cursor_file)
+
+    def _advance(self):
+        """翻到下一页（或滚动加载更多），列表发生变化返回True，已到末页返回False"""
+        signature = self._signature()
+        buttons = None
+        if self.mode != 'scroll':
+            buttons = [b for b in self.driver.find_elements(By.XPATH, self.next_xpath) if b.is_displayed()]
+            if not buttons:
+                return False
+
+        # 翻页会向站点请求下一页，与页面跳转一样先经过按主机限速
+        with self.crawler.rate_limiter.slot(self._start_url) as slot:
+            if buttons is None:
+                self.driver.execute_script(SCROLL_TO_BOTTOM_SCRIPT)
+            else:
+                self.driver.execute_script("arguments[0].click();", buttons[0])
+
+            changed = self.crawler.readiness.wait_until(
+                lambda d: self._signature() != signature, 'navigation', "列表翻页"
+            )
+            if changed:
+                self.crawler.readiness.wait_for_page_ready()
+            elif buttons is not None:
+                # 点击了下一页但列表没有变化，按超时处理（滚动模式下没有变化说明已到底）
+                slot.outcome = 'timeout'
+        return bool(changed)
+
+    def _recycle(self, start_url, page):
+        """浏览器内存超限时换用新标签页或重启浏览器，并回到当前页"""
+        url = self.driver.current_url
+        action = self.crawler.watchdog.check()
+        if not action:
+            return
+        self.crawler.watchdog.recycle(action, url)
+        # 单页应用翻页不改变URL时，回到列表首页后逐页跳到当前页
+        if url == start_url and page > 1:
+            self._resume(start_url, {'start_url': start_url, 'page': page})
+
+    def _resume(self, start_url, cursor):
+        """跳到上次中断时所在的页，返回当前页码（从1开始）"""
+        if not cursor or cursor.get('start_url') != start_url or cursor.get('page', 1) <= 1:
+            return 1
+        page = cursor['page']
+        logger.info(f"从第 {page} 页继续爬取")
+        if cursor.get('url') and cursor['url'] != start_url:
+            self.crawler.navigate(cursor['url'])
+            self.crawler.readiness.wait_for_page_ready()
+            return page
+        # 单页应用翻页不改变URL时，只能从首页逐页跳过
+        for current in range(1, page):
+            if not self._advance():
+                return current
+        return page
+
+    def crawl(self, first_extraction):
+        """从当前列表页开始爬取全部分页，first_extraction为当前页的提取任务，返回去重后的记录"""
+        records = {}
+
+        def collect(future):
+            for record in future.result():
+                records.setdefault(record_key(record), record)
+
+        if not self.enabled:
+            collect(first_extraction)
+            return list(records.values())
+
+        start_url = self._start_url = self.driver.current_url
+        cursor = self._load_cursor()
+        page = self._resume(start_url, cursor)
+        if page > 1:
+            # 中间跳过的页在上次运行中已提取；首页仍要收取，两次运行之间首页可能新增了条目
+            collect(first_extraction)
+            first_extraction = self.crawler.extractor.submit(self.driver.page_source, self.driver.current_url)
+
+        pending = first_extraction
+        finished = False
+        # max_pages限制的是本次运行爬取的页数，断点续爬时从当前页重新计数
+        walked = 1
+        while walked < self.max_pages:
+            try:
+                with self.crawler.tracer.span('pagination.advance'):
+                    has_next = self._advance()
+            except WebDriverException as e:
+                logger.warning(f"⚠️  翻页失败: {e}")
+                break
+            # 下一页已加载，再收取上一页的提取结果，保证翻页与提取并行
+            collect(pending)
+            if not has_next:
+                finished = True
+                pending = None
+                break
+            pending = self.crawler.extractor.submit(self.driver.page_source, self.driver.current_url)
+            page += 1
+            walked += 1
+            self._save_cursor(start_url, page)
+            logger.info(f"已翻到第 {page} 页，累计 {len(records)} 条记录")
+            try:
+                self._recycle(start_url, page)
+            except WebDriverException as e:
+                logger.warning(f"⚠️  回收浏览器失败: {e}")
+                break
+
+        if pending is not None:
+            collect(pending)
+        if finished:
+            self._clear_cursor()
+            logger.info(f"✅ 已爬取全部 {page} 页")
+        else:
+            self._save_cursor(start_url, page)
+            logger.info(f"已达到页数上限或中断，下次从第 {page} 页继续")
+        return list(records.values())
@@ -0,0 +1,149 @@
+"""
+多浏览器会话池：从已登录的Profile复制出多个副本，多个Chrome实例并行爬取URL队列
+"""
+
+import argparse
+import logging
+import os
+import queue
+import threading
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from crawler import Crawler, PROFILE_NAME
+from profile_manager import ProfileManager
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlerPool:
+    def __init__(self, config_path='config.json', size=None):
+        """初始化会话池，size默认取config.json中pool.size，未配置时为CPU核数"""
+        self.config_path = config_path
+        self.master = Crawler(config_path)
+        settings = self.master.config.get('pool', {})
+        self.size = size or settings.get('size') or os.cpu_count() or 1
+        self.max_retries = settings.get('max_retries', 2)
+        self.max_pages_per_session = settings.get('max_pages_per_session', 0)
+        self.profiles = ProfileManager(self.master.config, PROFILE_NAME)
+
+        self.urls = queue.Queue()
+        self.results = []
+        self._lock = threading.Lock()
+
+    def _start_session(self, index):
+        """启动第index个浏览器会话，Profile副本由精简的黄金Profile快速生成"""
+        logger.info(f"[会话{index}] 正在启动...")
+        crawler = Crawler(self.config_path, profile_dir=self.profiles.clone(index))
+        # 所有会话共用一个限速器，按主机的速率和并发对整个会话池生效
+        crawler.rate_limiter = self.master.rate_limiter
+        # 所有会话的结果写入同一批数据集分片
+        crawler.exporter = self.master.exporter
+        if crawler.setup_driver() is None:
+            raise RuntimeError("Profile不存在，请先完成登录")
+        # 所有会话共用主会话缓存的登录状态
+        crawler.restore_session()
+        return crawler
+
+    def _stop_session(self, crawler):
+        """关闭浏览器会话，忽略已崩溃浏览器的异常"""
+        if crawler is None:
+            return
+        # 数据集导出由所有会话共用，在run结束时由主会话关闭
+        crawler.close(keep_exporter=True)
+        # 浏览器退出后删除本会话的Profile副本
+        self.profiles.remove(crawler.profile_dir)
+
+    def _record(self, result):
+        with self._lock:
+            self.results.append(result)
+
+    def _worker(self, index):
+        """工作线程：从队列取URL，浏览器超时或崩溃时回收会话并重试"""
+        crawler = None
+        pages = 0
+        while True:
+            item = self.urls.get()
+            if item is None:
+                self.urls.task_done()
+                break
+
+            url, attempt = item
+            try:
+                if crawler is None:
+                    crawler = self._start_session(index)
+                    pages = 0
+                self._record(crawler.fetch_page(url))
+                pages += 1
+                # 标签页或浏览器内存超限时回收，下一个URL在新的标签页或浏览器中打开
+                crawler.watchdog.maybe_recycle()
+
+                # 定期重启会话，避免长时间运行后浏览器变慢
+                if self.max_pages_per_session and pages >= self.max_pages_per_session:
+                    logger.info(f"[会话{index}] 已处理 {pages} 个页面，重启浏览器")
+                    self._stop_session(crawler)
+                    crawler = None
+            except (TimeoutException, WebDriverException) as e:
+                logger.warning(f"[会话{index}] 浏览器异常，回收会话: {e}")
+                self._stop_session(crawler)
+                crawler = None
+                if attempt < self.max_retries:
+                    logger.info(f"[会话{index}] 重新排队: {url}（第{attempt + 1}次重试）")
+                    self.urls.put((url, attempt + 1))
+                else:
+                    self._record({'url': url, 'error': str(e)})
+            except Exception as e:
+                logger.error(f"[会话{index}] 爬取失败 {url}: {e}")
+                self._record({'url': url, 'error': str(e)})
+            finally:
+                self.urls.task_done()
+
+        self._stop_session(crawler)
+
+    def run(self, urls):
+        """并行爬取URL列表，返回每个URL的结果（失败的结果含error字段）"""
+        if not self.master.migrate_chrome_profile():
+            logger.error("❌ 未找到已登录的Profile，请先运行 crawler.py 完成登录")
+            return []
+
+        # 只含登录状态的黄金Profile，源Profile未变化时复用上次生成的
+        self.profiles.build_golden(self.master.profile_dir)
+
+        # 跳过近期已抓取的URL，中断后重新运行即可继续
+        urls = self.master.index.pending_urls(urls)
+        size = min(self.size, len(urls)) or 1
+        logger.info(f"启动 {size} 个浏览器会话，共 {len(urls)} 个URL")
+
+        self.results = []
+        for url in urls:
+            self.urls.put((url, 0))
+
+        workers = [threading.Thread(target=self._worker, args=(i,), daemon=True) for i in range(size)]
+        for worker in workers:
+            worker.start()
+
+        # 等待所有URL（包括重试）处理完，再通知工作线程退出
+        self.urls.join()
+        for _ in workers:
+            self.urls.put(None)
+        for worker in workers:
+            worker.join()
+        self.profiles.cleanup()
+        self.master.close()
+
+        failed = sum(1 for r in self.results if 'error' in r)
+        logger.info(f"✅ 爬取完成: 成功 {len(self.results) - failed} 个，失败 {failed} 个")
+        return self.results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='多浏览器并行爬取')
+    parser.add_argument('url_file', help='URL列表文件，每行一个URL')
+    parser.add_argument('--size', type=int, default=None, help='浏览器会话数量')
+    parser.add_argument('--config', default='config.json', help='配置文件路径')
+    args = parser.parse_args()
+
+    with open(args.url_file, 'r', encoding='utf-8') as f:
+        url_list = [line.strip() for line in f if line.strip()]
+
+    CrawlerPool(args.config, size=args.size).run(url_list)
@@ -0,0 +1,169 @@
+"""
+Profile管理：从已登录的Profile中只保留Cookie、Local Storage和Preferences生成精简的"黄金"Profile，
+并行会话的副本通过硬链接/reflink或精简复制生成，用完即删，启动额外会话只需毫秒级
+"""
+
+import logging
+import os
+import shutil
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+# Profile目录中需要保留的内容（登录状态所需），其余缓存、历史、GPU缓存、Service Worker等都不复制
+DEFAULT_KEEP = [
+    'Cookies',
+    'Cookies-journal',
+    'Network/Cookies',
+    'Network/Cookies-journal',
+    'Local Storage',
+    'Preferences',
+    'Secure Preferences',
+]
+
+# 用户数据目录根下的文件：Local State中保存了Cookie的加密密钥，缺少它副本中的登录状态无法解密
+USER_DATA_FILES = ['Local State']
+
+# Linux上的FICLONE ioctl，在btrfs/xfs等支持reflink的文件系统上瞬间完成写时复制
+FICLONE = 0x40049409
+
+
+def _immutable(path):
+    """LevelDB的.ldb数据文件写入后不再修改，可安全地硬链接；SQLite、日志和MANIFEST会原地修改，必须复制"""
+    return path.endswith('.ldb')
+
+
+def _reflink(src, dst):
+    if not sys.platform.startswith('linux'):
+        return False
+    import fcntl
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        shutil.copystat(src, dst)
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def _copy_tree(src, dst, method):
+    """复制目录，method为hardlink时不可变文件用硬链接，其余文件尽量用reflink，都不支持时普通复制"""
+    counts = {'hardlink': 0, 'reflink': 0, 'copy': 0}
+
+    def copy_file(s, d):
+        if method == 'hardlink' and _immutable(s):
+            try:
+                os.link(s, d)
+                counts['hardlink'] += 1
+                return d
+            except OSError:
+                pass
+        if method in ('hardlink', 'reflink') and _reflink(s, d):
+            counts['reflink'] += 1
+            return d
+        shutil.copy2(s, d)
+        counts['copy'] += 1
+        return d
+
+    if os.path.isdir(src):
+        shutil.copytree(src, dst, copy_function=copy_file, dirs_exist_ok=True)
+    else:
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        copy_file(src, dst)
+    return counts
+
+
+def copy_minimal_profile(source_profile, dest_profile, keep=None):
+    """只复制Profile中登录状态所需的内容，返回复制的条目数"""
+    copied = 0
+    for entry in keep or DEFAULT_KEEP:
+        src = os.path.join(source_profile, entry)
+        if os.path.exists(src):
+            _copy_tree(src, os.path.join(dest_profile, entry), 'copy')
+            copied += 1
+    os.makedirs(dest_profile, exist_ok=True)
+    return copied
+
+
+class ProfileManager:
+    def __init__(self, config, profile_name):
+        """初始化Profile管理器，配置取config.json中的profiles"""
+        settings = config.get('profiles', {})
+        self.profile_name = profile_name
+        self.golden_dir = os.path.abspath(settings.get('golden_dir', 'chrome_profile_golden'))
+        self.pool_dir = os.path.abspath(settings.get('pool_dir', 'chrome_profile_pool'))
+        self.keep = settings.get('keep', DEFAULT_KEEP)
+        self.clone_method = settings.get('clone_method', 'hardlink')
+        if self.clone_method not in ('hardlink', 'reflink', 'copy'):
+            logger.warning(f"⚠️  未知的profiles.clone_method: {self.clone_method}，使用hardlink")
+            self.clone_method = 'hardlink'
+
+    def _source_mtime(self, user_data_dir):
+        """源Profile中需保留内容的最后修改时间（目录取其中最新的文件）"""
+        paths = [os.path.join(user_data_dir, self.profile_name, entry) for entry in self.keep]
+        paths += [os.path.join(user_data_dir, name) for name in USER_DATA_FILES]
+        mtimes = []
+        for path in paths:
+            if os.path.isdir(path):
+                mtimes.extend(os.path.getmtime(os.path.join(root, name))
+                              for root, _, files in os.walk(path) for name in files)
+            elif os.path.exists(path):
+                mtimes.append(os.path.getmtime(path))
+        return max(mtimes, default=0)
+
+    def build_golden(self, user_data_dir):
+        """从已登录的用户数据目录生成黄金Profile；源Profile未变化时直接复用，返回黄金Profile的用户数据目录"""
+        marker = os.path.join(self.golden_dir, '.built_at')
+        source_mtime = self._source_mtime(user_data_dir)
+        if os.path.exists(marker) and os.path.getmtime(marker) >= source_mtime:
+            return self.golden_dir
+
+        start = time.time()
+        # 先生成到临时目录再替换，避免中途失败留下不完整的黄金Profile
+        tmp_dir = self.golden_dir + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        copied = copy_minimal_profile(os.path.join(user_data_dir, self.profile_name),
+                                      os.path.join(tmp_dir, self.profile_name), self.keep)
+        for name in USER_DATA_FILES:
+            if os.path.exists(os.path.join(user_data_dir, name)):
+                shutil.copy2(os.path.join(user_data_dir, name), tmp_dir)
+        with open(os.path.join(tmp_dir, '.built_at'), 'w', encoding='utf-8') as f:
+            f.write(str(time.time()))
+        shutil.rmtree(self.golden_dir, ignore_errors=True)
+        os.replace(tmp_dir, self.golden_dir)
+        logger.info(f"✅ 已生成精简Profile（{copied} 项，{self._size_mb(self.golden_dir):.1f}MB），"
+                    f"耗时 {time.time() - start:.2f}s")
+        return self.golden_dir
+
+    def clone(self, index):
+        """从黄金Profile生成第index个会话的副本，返回其用户数据目录"""
+        worker_dir = os.path.join(self.pool_dir, f'worker_{index}')
+        self.remove(worker_dir)
+        start = time.time()
+        counts = _copy_tree(self.golden_dir, worker_dir, self.clone_method)
+        marker = os.path.join(worker_dir, '.built_at')
+        if os.path.exists(marker):
+            os.remove(marker)
+        logger.info(f"[会话{index}] Profile副本已就绪（硬链接 {counts['hardlink']}，reflink {counts['reflink']}，"
+                    f"复制 {counts['copy']}），耗时 {(time.time() - start) * 1000:.0f}ms")
+        return worker_dir
+
+    def remove(self, worker_dir):
+        """删除会话副本（硬链接的文件只删除链接，不影响黄金Profile）"""
+        if os.path.exists(worker_dir):
+            shutil.rmtree(worker_dir, ignore_errors=True)
+
+    def cleanup(self):
+        """删除所有会话副本"""
+        if os.path.exists(self.pool_dir):
+            shutil.rmtree(self.pool_dir, ignore_errors=True)
+
+    @staticmethod
+    def _size_mb(path):
+        total = 0
+        for root, _, files in os.walk(path):
+            total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return total / (1024 * 1024)
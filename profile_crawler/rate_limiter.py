@@ -0,0 +1,184 @@
+"""
+按主机的自适应限速：令牌桶控制请求速率，并发上限和速率按AIMD调整——响应快且无错误时逐步加速，
+遇到超时、429/503或验证码页面时减半并冷却，所有页面跳转、导致跳转的点击和HTTP抓取都先经过这里
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import TimeoutException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'enabled': True,
+    'initial_rate': 2.0,        # 每秒请求数
+    'min_rate': 0.2,
+    'max_rate': 10.0,
+    'burst': 2,
+    'increase': 0.2,            # 每次健康响应增加的速率（加性增）
+    'decrease': 0.5,            # 被限流时速率和并发乘以的系数（乘性减）
+    'target_latency': 5.0,      # 超过该耗时（秒）的响应不再加速
+    'initial_concurrency': 2,
+    'max_concurrency': 8,
+    'cooldown': 30,             # 被限流后暂停该主机的秒数（响应带Retry-After时以其为准）
+    'error_threshold': 0.3,     # 错误率（指数平均）超过该值时同样减速
+}
+
+# 页面中出现这些文字说明触发了反爬验证
+DEFAULT_CAPTCHA_MARKERS = ['访问过于频繁', '请完成安全验证', '滑动验证']
+
+# 等待空闲并发槽位时的轮询间隔
+POLL_INTERVAL = 0.05
+
+
+class _HostState:
+    def __init__(self, settings):
+        self.rate = settings['initial_rate']
+        self.tokens = float(settings['burst'])
+        self.updated = time.monotonic()
+        self.concurrency = settings['initial_concurrency']
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.error_rate = 0.0
+        self.healthy = 0
+        self.requests = 0
+        self.backoffs = 0
+
+
+class _Slot:
+    """一次请求的反馈：调用方可标记超时、验证码等结果"""
+
+    def __init__(self):
+        self.outcome = 'ok'
+        self.retry_after = None
+
+    def captcha(self):
+        self.outcome = 'captcha'
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, config):
+        """初始化限速器，配置取config.json中的rate_limit"""
+        settings = dict(DEFAULT_SETTINGS, **config.get('rate_limit', {}))
+        self.settings = settings
+        self.enabled = settings['enabled']
+        self.captcha_markers = settings.get('captcha_markers', DEFAULT_CAPTCHA_MARKERS)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.settings)
+        return state
+
+    def _reserve(self, host):
+        """尝试占用一个请求名额，成功返回0，否则返回建议等待的秒数"""
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(host)
+            if now < state.cooldown_until:
+                return state.cooldown_until - now
+            if state.in_flight >= state.concurrency:
+                return POLL_INTERVAL
+            state.tokens = min(float(self.settings['burst']), state.tokens + (now - state.updated) * state.rate)
+            state.updated = now
+            if state.tokens < 1:
+                return (1 - state.tokens) / state.rate
+            state.tokens -= 1
+            state.in_flight += 1
+            state.requests += 1
+            return 0
+
+    def try_acquire(self, host):
+        """不等待地尝试占用一个请求名额，成功返回True（需在请求结束后调用release）"""
+        return not self._reserve(host)
+
+    def acquire(self, host):
+        """阻塞直到可以向该主机发起请求"""
+        while True:
+            wait = self._reserve(host)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, host):
+        """协程版acquire，用于HTTP并发抓取"""
+        while True:
+            wait = self._reserve(host)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, host, latency, outcome='ok', retry_after=None):
+        """请求结束后按结果调整速率和并发：健康响应加性增，超时、限流和验证码乘性减并冷却"""
+        s = self.settings
+        with self._lock:
+            state = self._state(host)
+            state.in_flight = max(0, state.in_flight - 1)
+            failed = outcome != 'ok'
+            state.error_rate = state.error_rate * 0.9 + (0.1 if failed else 0)
+
+            if outcome in ('timeout', 'throttled', 'captcha') or state.error_rate > s['error_threshold']:
+                state.rate = max(s['min_rate'], state.rate * s['decrease'])
+                state.concurrency = max(1, int(state.concurrency * s['decrease']))
+                state.tokens = 0
+                state.healthy = 0
+                state.backoffs += 1
+                if outcome in ('throttled', 'captcha'):
+                    state.cooldown_until = time.monotonic() + (retry_after or s['cooldown'])
+                logger.warning(f"⚠️  {host} 触发限速（{outcome}），速率降至 {state.rate:.2f}/s，并发 {state.concurrency}")
+            elif not failed and latency <= s['target_latency']:
+                state.rate = min(s['max_rate'], state.rate + s['increase'])
+                state.healthy += 1
+                # 每连续若干次健康响应增加一个并发名额
+                if state.healthy >= state.concurrency * 2 and state.concurrency < s['max_concurrency']:
+                    state.concurrency += 1
+                    state.healthy = 0
+
+    @contextmanager
+    def slot(self, url):
+        """在请求前后包裹：等待名额，结束后根据耗时和异常（或调用方标记的结果）调整限速"""
+        if not self.enabled:
+            yield _Slot()
+            return
+        host = urlsplit(url).hostname or ''
+        self.acquire(host)
+        slot = _Slot()
+        start = time.monotonic()
+        try:
+            yield slot
+        except TimeoutException:
+            slot.outcome = 'timeout'
+            raise
+        except Exception:
+            slot.outcome = 'error'
+            raise
+        finally:
+            self.release(host, time.monotonic() - start, slot.outcome, slot.retry_after)
+
+    def is_captcha(self, html_text):
+        """判断HTTP响应内容是否为验证码页面"""
+        return bool(html_text) and any(marker in html_text for marker in self.captcha_markers)
+
+    def outcome_for(self, status, html_text=None):
+        """按HTTP状态码和响应内容判断请求结果"""
+        if status in (429, 503):
+            return 'throttled'
+        if status >= 500:
+            return 'error'
+        if self.is_captcha(html_text):
+            return 'captcha'
+        return 'ok'
+
+    def summary(self):
+        """返回各主机当前的速率、并发和限速次数"""
+        with self._lock:
+            return {host: {'rate': round(state.rate, 3), 'concurrency': state.concurrency,
+                           'requests': state.requests, 'backoffs': state.backoffs}
+                    for host, state in self._hosts.items()}
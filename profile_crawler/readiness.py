@@ -0,0 +1,137 @@
+"""
+页面就绪检测：基于WebDriverWait、网络空闲与DOM变化信号，替代固定的time.sleep等待
+"""
+
+import logging
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+# 各步骤默认超时（秒），可在config.json的readiness.timeouts中覆盖
+DEFAULT_TIMEOUTS = {
+    'page_ready': 10,
+    'login_complete': 10,
+    'view_more': 10,
+    'navigation': 15,
+}
+
+# 通过CDP注入到每个新文档的探针：统计进行中的fetch/XHR请求，记录最近一次网络或DOM活动时间
+READINESS_PROBE_SCRIPT = r"""
+(function () {
+    if (window.__crawlerReady) { return; }
+    var state = window.__crawlerReady = {pending: 0, lastActivity: Date.now()};
+    function touch() { state.lastActivity = Date.now(); }
+    function done() { state.pending = Math.max(0, state.pending - 1); touch(); }
+    if (window.fetch) {
+        var origFetch = window.fetch;
+        window.fetch = function () {
+            state.pending++; touch();
+            try {
+                return origFetch.apply(this, arguments).finally(done);
+            } catch (e) { done(); throw e; }
+        };
+    }
+    var origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        state.pending++; touch();
+        this.addEventListener('loadend', done);
+        try {
+            return origSend.apply(this, arguments);
+        } catch (e) { done(); throw e; }
+    };
+    // 只关注节点增删，忽略轮播图等动画产生的属性变化
+    new MutationObserver(touch).observe(document, {childList: true, subtree: true});
+})();
+"""
+
+# 判断页面是否空闲：文档已加载、无进行中的请求、且最近quiet_ms毫秒内无DOM变化
+IDLE_CHECK_SCRIPT = r"""
+var quietMs = arguments[0];
+if (document.readyState === 'loading') { return false; }
+var state = window.__crawlerReady;
+if (!state) { return document.readyState === 'complete'; }
+return state.pending === 0 && (Date.now() - state.lastActivity) >= quietMs;
+"""
+
+# 判断页面HTML中是否包含任一关键字，避免通过WebDriver传输整个page_source
+TEXT_CHECK_SCRIPT = r"""
+var html = document.documentElement ? document.documentElement.innerHTML : '';
+var keywords = arguments[0];
+for (var i = 0; i < keywords.length; i++) {
+    if (html.indexOf(keywords[i]) !== -1) { return keywords[i]; }
+}
+return null;
+"""
+
+
+class PageReadiness:
+    """按条件等待页面就绪，条件满足立即返回，超时则记录警告后继续"""
+
+    def __init__(self, driver, config):
+        self.driver = driver
+        settings = config.get('readiness', {})
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **settings.get('timeouts', {}))
+        self.poll_frequency = settings.get('poll_frequency', 0.1)
+        self.quiet_ms = settings.get('quiet_ms', 500)
+
+    def install(self):
+        """注入就绪探针，之后打开的每个页面都会自动加载"""
+        self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+            'source': READINESS_PROBE_SCRIPT
+        })
+
+    def timeout(self, step):
+        """获取某个步骤的超时时间"""
+        return self.timeouts.get(step, DEFAULT_TIMEOUTS['page_ready'])
+
+    def wait_until(self, condition, step, description=None):
+        """等待条件成立，返回条件的结果；超时返回None"""
+        timeout = self.timeout(step)
+        wait = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency,
+                             ignored_exceptions=(WebDriverException,))
+        try:
+            return wait.until(condition)
+        except TimeoutException:
+            logger.warning(f"⚠️  等待超时({timeout}s): {description or step}")
+            return None
+
+    def wait_for_page_ready(self, step='page_ready'):
+        """等待文档加载完成且网络与DOM进入空闲"""
+        return bool(self.wait_until(
+            lambda d: d.execute_script(IDLE_CHECK_SCRIPT, self.quiet_ms),
+            step, "页面加载与网络空闲"
+        ))
+
+    def wait_for_elements(self, by, value, step, visible=True):
+        """等待匹配的元素出现，返回元素列表（超时返回空列表）"""
+        def find(d):
+            elements = d.find_elements(by, value)
+            if visible:
+                elements = [e for e in elements if e.is_displayed()]
+            return elements or False
+
+        return self.wait_until(find, step, f"元素出现: {value}") or []
+
+    def wait_for_text(self, keywords, step):
+        """等待页面出现任一关键字，返回命中的关键字（超时返回None）"""
+        keywords = list(keywords)
+        return self.wait_until(
+            lambda d: d.execute_script(TEXT_CHECK_SCRIPT, keywords),
+            step, f"页面出现关键字: {keywords}"
+        )
+
+    def has_text(self, keywords):
+        """立即检查页面是否包含任一关键字，返回命中的关键字或None"""
+        return self.driver.execute_script(TEXT_CHECK_SCRIPT, list(keywords))
+
+    def wait_for_navigation(self, url_before, handles_before, step='navigation'):
+        """等待点击后发生跳转（URL变化或打开新窗口），再等待新页面就绪"""
+        changed = self.wait_until(
+            lambda d: len(d.window_handles) > handles_before or d.current_url != url_before,
+            step, "页面跳转"
+        )
+        if changed:
+            self.wait_for_page_ready(step)
+        return bool(changed)
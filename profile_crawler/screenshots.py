@@ -0,0 +1,104 @@
+"""
+截图：通过CDP Page.captureScreenshot由浏览器直接编码为JPEG/WebP，可只截取指定区域（如"最新上线"区块）
+或整页；按策略决定是否截图，base64解码和写盘交给产物写入线程，不占用爬取线程
+"""
+
+import logging
+
+from selenium.common.exceptions import WebDriverException
+
+from artifacts import Base64Image
+
+logger = logging.getLogger(__name__)
+
+# 截图策略: always 每次截图; every_n 每N次截一次; on_failure 只在流程失败时截一张; never 不截图
+POLICIES = ('always', 'every_n', 'on_failure', 'never')
+
+FORMAT_EXTENSIONS = {'jpeg': '.jpg', 'webp': '.webp', 'png': '.png'}
+
+# 按XPath定位区块并返回其在整个文档中的位置（CSS像素），一次往返完成查找和测量
+CLIP_RECT_SCRIPT = r"""
+var node = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!node || !node.getBoundingClientRect) { return null; }
+var r = node.getBoundingClientRect();
+if (!r.width || !r.height) { return null; }
+return {x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height};
+"""
+
+
+class ScreenshotEngine:
+    def __init__(self, crawler):
+        """初始化截图配置，取config.json中的screenshots；未配置policy时沿用artifacts.policy"""
+        self.crawler = crawler
+        settings = crawler.config.get('screenshots', {})
+        artifacts_policy = crawler.artifacts.policy
+        self.policy = settings.get('policy', artifacts_policy)
+        if self.policy not in POLICIES:
+            logger.warning(f"⚠️  未知的screenshots.policy: {self.policy}，使用{artifacts_policy}")
+            self.policy = artifacts_policy
+        self.every_n = max(1, settings.get('every_n', 10))
+        self.format = settings.get('format', 'jpeg')
+        if self.format not in FORMAT_EXTENSIONS:
+            logger.warning(f"⚠️  未知的screenshots.format: {self.format}，使用jpeg")
+            self.format = 'jpeg'
+        self.quality = settings.get('quality', 70)
+        self.full_page = settings.get('full_page', False)
+        # WebP单边最大16383像素，超长页面截断
+        self.max_height = settings.get('max_height', 16000)
+        # 截图名称 -> 区块XPath或 {x, y, width, height} 区域，未配置的截取可见区域
+        self.clips = settings.get('clips', {})
+        self.requests = 0
+
+    def _due(self, force):
+        if force:
+            return self.policy != 'never'
+        if self.policy == 'always':
+            return True
+        if self.policy == 'every_n':
+            # 第1次、第N+1次……截图
+            self.requests += 1
+            return (self.requests - 1) % self.every_n == 0
+        return False
+
+    def _clip(self, prefix):
+        """计算截图区域（文档坐标），未配置区域且不截整页时返回None，截取可见区域"""
+        driver = self.crawler.driver
+        spec = self.clips.get(prefix)
+        if isinstance(spec, dict):
+            return dict(spec, scale=spec.get('scale', 1))
+        if spec:
+            rect = driver.execute_script(CLIP_RECT_SCRIPT, spec)
+            if rect:
+                return dict(rect, scale=1)
+            logger.warning(f"⚠️  未找到截图区块 {spec}，改为截取可见区域")
+        if self.full_page:
+            metrics = driver.execute_cdp_cmd('Page.getLayoutMetrics', {})
+            size = metrics.get('cssContentSize') or metrics.get('contentSize')
+            return {'x': 0, 'y': 0, 'width': size['width'],
+                    'height': min(size['height'], self.max_height), 'scale': 1}
+        return None
+
+    def capture(self, prefix, force=False):
+        """按策略截图，返回文件路径（未截图返回None）；force用于失败现场，只有never策略不截"""
+        if not self._due(force):
+            return None
+        params = {'format': self.format}
+        if self.format != 'png':
+            params['quality'] = self.quality
+        try:
+            with self.crawler.tracer.span('screenshot', prefix=prefix, format=self.format):
+                clip = self._clip(prefix)
+                if clip:
+                    # 区域可能在可见范围之外，按文档坐标截取
+                    params['clip'] = clip
+                    params['captureBeyondViewport'] = True
+                data = self.crawler.driver.execute_cdp_cmd('Page.captureScreenshot', params)['data']
+        except WebDriverException as e:
+            logger.warning(f"⚠️  截图失败 {prefix}: {e}")
+            return None
+        return self.crawler.artifacts.save_screenshot(prefix, Base64Image(data), force=True,
+                                                      ext=FORMAT_EXTENSIONS[self.format])
+
+    def capture_failure(self):
+        """流程失败时截取当前页面（always和every_n策略下已有正常截图时也补一张失败现场）"""
+        return self.capture('failure', force=True)
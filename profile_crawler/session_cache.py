@@ -0,0 +1,114 @@
+"""
+登录会话缓存：登录成功后导出Cookie和localStorage，下次启动时通过CDP恢复，跳过登录流程
+"""
+
+import json
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Network.setCookies接受的字段，getAllCookies返回的其余字段（size、priority等）需去掉
+COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+# 在目标站点的第一个文档中写回localStorage，写入后由restore_finished移除
+LOCAL_STORAGE_RESTORE_SCRIPT = r"""
+(function (origin, items) {
+    if (window.location.origin !== origin) { return; }
+    try {
+        for (var key in items) { window.localStorage.setItem(key, items[key]); }
+    } catch (e) {}
+})(%s, %s);
+"""
+
+
+class SessionCache:
+    def __init__(self, config):
+        """初始化会话缓存，配置取config.json中的session_cache"""
+        settings = config.get('session_cache', {})
+        self.enabled = settings.get('enabled', True)
+        self.path = settings.get('path', os.path.join('chrome_profile', 'session_cache.json'))
+        self.ttl = settings.get('ttl_hours', 12) * 3600
+        self._restore_script_id = None
+
+    def load(self):
+        """读取未过期的会话快照，不存在或已过期返回None"""
+        if not self.enabled or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  读取会话缓存失败: {e}")
+            return None
+        if snapshot.get('expires_at', 0) <= time.time():
+            logger.info("会话缓存已过期")
+            return None
+        return snapshot
+
+    def save(self, driver):
+        """导出当前浏览器的Cookie和当前站点的localStorage"""
+        if not self.enabled:
+            return
+        now = time.time()
+        cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        local_storage = driver.execute_script(
+            "var items = {};"
+            "for (var i = 0; i < localStorage.length; i++) {"
+            "  var key = localStorage.key(i); items[key] = localStorage.getItem(key);"
+            "}"
+            "return items;"
+        )
+        # 快照有效期不超过最早过期的持久Cookie
+        expires_at = now + self.ttl
+        cookie_expiries = [c['expires'] for c in cookies if not c.get('session') and c.get('expires', -1) > now]
+        if cookie_expiries:
+            expires_at = min(expires_at, min(cookie_expiries))
+
+        parts = urlsplit(driver.current_url)
+        snapshot = {
+            'saved_at': now,
+            'expires_at': expires_at,
+            'origin': f'{parts.scheme}://{parts.netloc}',
+            'cookies': cookies,
+            'local_storage': local_storage or {},
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        logger.info(f"✅ 会话已缓存: {len(cookies)} 个Cookie, {len(snapshot['local_storage'])} 项localStorage")
+
+    def restore(self, driver, snapshot):
+        """在访问目标页面前写回Cookie，并登记localStorage恢复脚本"""
+        cookies = []
+        for cookie in snapshot.get('cookies', []):
+            params = {k: cookie[k] for k in COOKIE_FIELDS if k in cookie}
+            if cookie.get('session'):
+                params.pop('expires', None)
+            cookies.append(params)
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+
+        if snapshot.get('local_storage'):
+            source = LOCAL_STORAGE_RESTORE_SCRIPT % (
+                json.dumps(snapshot['origin']), json.dumps(snapshot['local_storage'], ensure_ascii=False)
+            )
+            result = driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': source})
+            self._restore_script_id = result.get('identifier')
+        logger.info(f"已从会话缓存恢复 {len(cookies)} 个Cookie")
+
+    def restore_finished(self, driver):
+        """目标页面已加载后移除localStorage恢复脚本，避免覆盖站点后续写入的数据"""
+        if self._restore_script_id:
+            driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument',
+                                   {'identifier': self._restore_script_id})
+            self._restore_script_id = None
+
+    def clear(self):
+        """删除失效的会话缓存"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+            logger.info("已删除失效的会话缓存")
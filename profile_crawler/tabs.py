@@ -0,0 +1,225 @@
+"""
+单浏览器多标签页并发：在同一个已登录的Chrome中通过CDP Target.createTarget打开多个标签页，
+用Page.navigate发起加载后立即返回，多个页面的加载在浏览器中重叠进行；
+所有标签页共用同一个Profile的Cookie，比启动多个浏览器节省内存和启动时间
+"""
+
+import argparse
+import logging
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from readiness import IDLE_CHECK_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+# Page.navigate之前在旧文档上做标记，新文档提交后window被替换、标记消失，避免把旧页面误判为已加载
+MARK_STALE_SCRIPT = "window.__crawlerStale = true;"
+
+TAB_READY_SCRIPT = "if (window.__crawlerStale) { return false; }\n" + IDLE_CHECK_SCRIPT
+
+
+def new_tab(driver, background=True):
+    """通过CDP在当前浏览器中新建标签页，切换过去并返回其窗口句柄"""
+    target = driver.execute_cdp_cmd('Target.createTarget', {'url': 'about:blank', 'background': background})
+    handle = target.get('targetId')
+    # chromedriver的窗口句柄即CDP的targetId，个别版本不一致时退回WebDriver方式新建
+    if handle not in driver.window_handles:
+        driver.switch_to.new_window('tab')
+        return driver.current_window_handle
+    driver.switch_to.window(handle)
+    return handle
+
+
+class _Tab:
+    def __init__(self, handle):
+        self.handle = handle
+        self.url = None
+        self.attempt = 0
+        self.started = 0.0
+
+
+class TabScheduler:
+    def __init__(self, crawler, size=None):
+        """初始化标签页调度器，配置取config.json中的tabs；crawler需已启动浏览器并完成登录"""
+        self.crawler = crawler
+        settings = crawler.config.get('tabs', {})
+        self.size = size or settings.get('size', 4)
+        self.max_retries = settings.get('max_retries', 2)
+        self.load_timeout = settings.get('load_timeout', crawler.config.get('page_load_timeout', 30))
+        self.poll_interval = settings.get('poll_interval', 0.1)
+        self.quiet_ms = crawler.config.get('readiness', {}).get('quiet_ms', 500)
+        self.tabs = []
+        self.results = []
+        self._current = None
+
+    @property
+    def driver(self):
+        return self.crawler.driver
+
+    def _switch(self, tab):
+        # 记录当前句柄，避免每次切换前多一次WebDriver往返
+        if self._current != tab.handle:
+            self.driver.switch_to.window(tab.handle)
+            self._current = tab.handle
+
+    def _open_tab(self):
+        """通过CDP在当前浏览器中新建后台标签页并完成注入，返回_Tab"""
+        tab = _Tab(new_tab(self.driver))
+        self._current = tab.handle
+        self.crawler.prepare_tab()
+        return tab
+
+    def _replace(self, tab):
+        """新建标签页替换tab，旧标签页仍存在时关闭"""
+        replacement = self._open_tab()
+        self.tabs[self.tabs.index(tab)] = replacement
+        if tab.handle in self.driver.window_handles:
+            self._close_tab(tab)
+        return replacement
+
+    def _recover(self, tab):
+        """标签页已崩溃或被关闭时新建一个替换它"""
+        if tab.handle in self.driver.window_handles:
+            return tab
+        logger.warning("⚠️  标签页已失效，新建标签页替换")
+        return self._replace(tab)
+
+    def _close_tab(self, tab):
+        try:
+            self._switch(tab)
+            self.driver.close()
+            self._current = None
+        except WebDriverException as e:
+            logger.warning(f"⚠️  关闭标签页失败: {e}")
+
+    def _start(self, tab, url, attempt):
+        """在标签页中发起加载，不等待页面完成"""
+        # 先登记URL，切换标签页失败时_fail也能释放对应主机的限速名额并重新排队
+        tab.url, tab.attempt, tab.started = url, attempt, time.monotonic()
+        self._switch(tab)
+        self.driver.execute_script(MARK_STALE_SCRIPT)
+        result = self.driver.execute_cdp_cmd('Page.navigate', {'url': url})
+        if result.get('errorText'):
+            raise WebDriverException(result['errorText'])
+
+    def _poll(self, tab):
+        """检查标签页是否加载完成，完成返回页面信息，仍在加载返回None，超时抛出TimeoutError"""
+        self._switch(tab)
+        if self.driver.execute_script(TAB_READY_SCRIPT, self.quiet_ms):
+            load_ms = round((time.monotonic() - tab.started) * 1000, 3)
+            with self.crawler.tracer.span('tab.save_page', url=tab.url, load_ms=load_ms):
+                return self.crawler.page_result(tab.url)
+        if time.monotonic() - tab.started > self.load_timeout:
+            self.driver.execute_cdp_cmd('Page.stopLoading', {})
+            raise TimeoutError(f"页面加载超时({self.load_timeout}s)")
+        return None
+
+    def _release(self, tab, outcome):
+        limiter = self.crawler.rate_limiter
+        if limiter.enabled:
+            limiter.release(urlsplit(tab.url).hostname or '', time.monotonic() - tab.started, outcome)
+
+    def _acquire(self, url):
+        limiter = self.crawler.rate_limiter
+        return not limiter.enabled or limiter.try_acquire(urlsplit(url).hostname or '')
+
+    def run(self, urls):
+        """在多个标签页中并发加载URL列表，返回每个URL的结果（失败的结果含error字段）"""
+        urls = self.crawler.index.pending_urls(urls)
+        if not urls:
+            return []
+        # 当前标签页作为第一个，其余通过CDP新建；会话缓存的恢复脚本只登记在当前标签页，先移除
+        self.crawler.session_cache.restore_finished(self.driver)
+        self._current = self.driver.current_window_handle
+        self.tabs = [_Tab(self._current)]
+        while len(self.tabs) < min(self.size, len(urls)):
+            self.tabs.append(self._open_tab())
+        logger.info(f"在 {len(self.tabs)} 个标签页中并发加载 {len(urls)} 个URL")
+
+        start = time.time()
+        self.results = []
+        pending = deque((url, 0) for url in urls)
+        idle = list(self.tabs)
+        busy = []
+        try:
+            while pending or busy:
+                # 给空闲标签页分配URL，限速器没有名额时等下一轮
+                while idle and pending and self._acquire(pending[0][0]):
+                    tab = idle.pop()
+                    url, attempt = pending.popleft()
+                    try:
+                        self._start(tab, url, attempt)
+                        busy.append(tab)
+                    except WebDriverException as e:
+                        self._fail(tab, e, pending)
+                        idle.append(self._recover(tab))
+
+                for tab in list(busy):
+                    try:
+                        result = self._poll(tab)
+                        if result is None:
+                            continue
+                        outcome = 'captcha' if self.crawler.captcha_found() else 'ok'
+                        self._release(tab, outcome)
+                        self.results.append(result)
+                        busy.remove(tab)
+                        # 内存超限时换用新标签页；其他标签页仍在加载，不重启整个浏览器
+                        if self.crawler.watchdog.check():
+                            tab = self._replace(tab)
+                        idle.append(tab)
+                    except (TimeoutError, WebDriverException) as e:
+                        self._fail(tab, e, pending)
+                        busy.remove(tab)
+                        idle.append(self._recover(tab))
+
+                time.sleep(self.poll_interval)
+        finally:
+            # 只保留第一个标签页，浏览器继续供后续流程使用
+            for tab in self.tabs[1:]:
+                self._close_tab(tab)
+            self._switch(self.tabs[0])
+            self.tabs = []
+
+        failed = sum(1 for r in self.results if 'error' in r)
+        logger.info(f"✅ 标签页并发加载完成: 成功 {len(self.results) - failed} 个，失败 {failed} 个，"
+                    f"耗时 {time.time() - start:.2f}s")
+        return self.results
+
+    def _fail(self, tab, error, pending):
+        """加载失败：通知限速器，未超过重试次数时重新排队"""
+        self._release(tab, 'timeout' if isinstance(error, TimeoutError) else 'error')
+        if tab.attempt < self.max_retries:
+            logger.warning(f"⚠️  标签页加载失败，重新排队: {tab.url}（{error}）")
+            pending.append((tab.url, tab.attempt + 1))
+        else:
+            logger.error(f"❌ 爬取失败 {tab.url}: {error}")
+            self.results.append({'url': tab.url, 'error': str(error)})
+
+
+if __name__ == '__main__':
+    from crawler import Crawler
+
+    parser = argparse.ArgumentParser(description='单浏览器多标签页并发爬取')
+    parser.add_argument('url_file', help='URL列表文件，每行一个URL')
+    parser.add_argument('--size', type=int, default=None, help='标签页数量')
+    parser.add_argument('--config', default='config.json', help='配置文件路径')
+    parser.add_argument('--no-login', action='store_true', help='跳过登录流程')
+    args = parser.parse_args()
+
+    with open(args.url_file, 'r', encoding='utf-8') as f:
+        url_list = [line.strip() for line in f if line.strip()]
+
+    tab_crawler = Crawler(args.config)
+    try:
+        if tab_crawler.setup_driver() is None:
+            raise SystemExit(1)
+        if not args.no_login and not tab_crawler.auto_login():
+            logger.error("❌ 登录失败")
+            raise SystemExit(1)
+        TabScheduler(tab_crawler, size=args.size).run(url_list)
+    finally:
+        tab_crawler.close()